@@ -165,21 +165,29 @@ from routes.instructor_API.feedback import InstructorFeedbackAPI
 api_handler.add_resource(InstructorFeedbackAPI, '/api/instructor/feedback')
 
 # Instructor Insight APIs
-from routes.instructor_API.instructor_insight import InstructorInsightAPI, CourseInsightAPI, AtRiskStudentsAPI, TrainRiskModelAPI
+from routes.instructor_API.instructor_insight import InstructorInsightAPI, InstructorNarrativeAPI, CourseInsightAPI, AtRiskStudentsAPI, TrainRiskModelAPI
 api_handler.add_resource(InstructorInsightAPI, '/api/instructor/insights')
+api_handler.add_resource(InstructorNarrativeAPI, '/api/instructor/insights/narrative/<string:narrative_key>')
 api_handler.add_resource(CourseInsightAPI, '/api/instructor/courses/<int:course_id>/insights')
 api_handler.add_resource(AtRiskStudentsAPI, '/api/instructor/at-risk-students')
 api_handler.add_resource(TrainRiskModelAPI, '/api/admin/train-risk-model')
 
 # Student Insight APIs
-from routes.student_API.student_insight import StudentInsightAPI, CourseRecommendationAPI, PerformanceComparisonAPI
+from routes.student_API.student_insight import StudentInsightAPI, StudentNarrativeAPI, CourseRecommendationAPI, PerformanceComparisonAPI, PerformanceComparisonListAPI
 api_handler.add_resource(StudentInsightAPI, '/api/student/insights')
+api_handler.add_resource(StudentNarrativeAPI, '/api/student/insights/narrative/<string:narrative_key>')
 api_handler.add_resource(CourseRecommendationAPI, '/api/student/recommendations')
 api_handler.add_resource(PerformanceComparisonAPI, '/api/student/courses/<int:course_id>/comparison')
+api_handler.add_resource(PerformanceComparisonListAPI, '/api/student/courses/comparison')
 
 # Data Generation API (for demo purposes)
-from routes.admin_API.data_generation import GenerateSyntheticDataAPI
+from routes.admin_API.data_generation import GenerateSyntheticDataAPI, GenerateSyntheticDataStatusAPI
 api_handler.add_resource(GenerateSyntheticDataAPI, '/api/admin/generate-data')
+api_handler.add_resource(GenerateSyntheticDataStatusAPI, '/api/admin/generate-data/<string:job_id>')
+
+# Analytics cache statistics
+from routes.admin_API.analytics_cache import AnalyticsCacheStatsAPI
+api_handler.add_resource(AnalyticsCacheStatsAPI, '/api/admin/analytics-cache')
 
 # RAG chatbot 
 from chatbot.chatbotapi import ChatResource, ConversationsResource, ConversationResource
@@ -1,82 +1,570 @@
 import pandas as pd
 import numpy as np
+import joblib
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.impute import SimpleImputer
 import os
+import glob
 import json
+import time
+import hashlib
+import copy
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from pandas.api.types import union_categoricals
 from datetime import datetime
 
+# pyarrow is optional: without it the CSV files are always parsed
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+# Schema metadata key holding the signature of the CSV files a Feather copy was built from
+FEATHER_SOURCE_KEY = b'analytics_source'
+
+# Dataset used by the API routes
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Tables that make up the analytics dataset, stored as <name>.csv
+DATASET_TABLES = ['students', 'enrollments', 'performance', 'interactions', 'feedback', 'courses']
+
+# Part files of a partitioned table, stored as <table>/part-<n>.csv in place of <table>.csv
+PARTITION_PATTERN = 'part-*.csv'
+
+# Seconds between checks for changed data files, and how long the files must
+# stay unchanged before a reload reads them
+RELOAD_CHECK_INTERVAL = 5
+RELOAD_SETTLE_SECONDS = 1
+
+# Size and lifetime (seconds) of the per-student metrics cache; the lifetime
+# bounds how stale the 30-day activity figures can get
+STUDENT_CACHE_SIZE = 2048
+STUDENT_CACHE_TTL = 300
+
+# Number of instructor-wide course summaries kept in memory
+INSTRUCTOR_CACHE_SIZE = 256
+
+# Size and lifetime (seconds) of the instructor dashboard cache, and how many
+# worker processes the command line precompute uses; the web app builds in process
+DASHBOARD_CACHE_SIZE = 256
+DASHBOARD_CACHE_TTL = 3600
+DASHBOARD_WORKERS = min(4, os.cpu_count() or 1)
+
+# Course part of every instructor dashboard, stored next to the dataset by a
+# precompute run and tagged with the dataset version it was built from
+DASHBOARD_STORE_FILE = 'instructor_dashboards.joblib'
+
+# Features the risk model is trained on, in column order
+RISK_FEATURES = ['quiz1', 'attendance_percentage', 'assignment_mean']
+
+# Trained risk model artifact, stored next to the dataset; the version is
+# bumped whenever the artifact layout or the feature set changes
+RISK_MODEL_FILE = 'risk_model.joblib'
+RISK_MODEL_VERSION = 1
+
+# Days counted as recent activity, and how many days of daily activity the
+# per-student histogram keeps (wider windows are counted from the log)
+RECENT_ACTIVITY_DAYS = 30
+ACTIVITY_HISTORY_DAYS = 90
+
+# Largest per-student daily count the histogram holds; busier days saturate
+ACTIVITY_COUNT_MAX = np.iinfo(np.uint16).max
+
+# Columns of the interaction log kept in memory (course names come from the
+# courses table), and the ones stored as categoricals
+INTERACTION_COLUMNS = ['student_id', 'timestamp', 'interaction_type', 'course_code', 'duration_minutes']
+INTERACTION_CATEGORIES = ['student_id', 'interaction_type', 'course_code']
+
+# Rows parsed per chunk when reading interactions.csv, and how many days of
+# events are kept (None keeps the whole log)
+INTERACTION_CHUNK_ROWS = 500000
+INTERACTION_RETENTION_DAYS = None
+
+# Insight text that also marks a student as "Behind on assessments"
+FALLING_BEHIND_INSIGHT = "Student is falling behind in current trimester assessments."
+
+# Columns parsed as datetimes when a table is read from CSV
+DATETIME_COLUMNS = {
+    'students': ['enrollment_date'],
+    'interactions': ['timestamp'],
+}
+
+# Score columns stored as float32, and the decimals they are rounded to when
+# widened back to float64 (undoing float32 representation error)
+SCORE_COLUMNS = ['quiz1', 'quiz2'] + [f'assignment{i}' for i in range(1, 13)] + ['attendance_percentage']
+SCORE_DECIMALS = 4
+
+# Compact column types applied when a table is loaded: categoricals for
+# repeated labels, float32 for scores and small ints for ratings (ratings
+# with gaps stay float)
+TABLE_SCHEMAS = {
+    'students': {'student_id': 'category'},
+    'enrollments': {column: 'category' for column in ['student_id', 'course_code', 'course_name', 'instructor', 'status']},
+    'performance': {
+        'student_id': 'category',
+        'course_code': 'category',
+        'grade': 'category',
+        **{column: 'float32' for column in SCORE_COLUMNS}
+    },
+    'feedback': {
+        **{column: 'category' for column in ['student_id', 'course_code', 'course_name', 'instructor']},
+        **{column: 'int8' for column in ['course_rating', 'instructor_rating', 'content_rating', 'difficulty_rating']}
+    },
+    'courses': {column: 'category' for column in ['course_code', 'course_name', 'instructor']},
+    'interactions': {
+        **{column: 'category' for column in INTERACTION_CATEGORIES},
+        'duration_minutes': 'float32'
+    },
+}
+
+# Columns each table is indexed by once the data is loaded
+INDEXED_COLUMNS = {
+    'students': ['student_id'],
+    'enrollments': ['student_id', 'course_code', 'instructor'],
+    'performance': ['student_id', 'course_code'],
+    'feedback': ['course_code', 'instructor'],
+    'student_courses': ['student_id'],
+}
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with an optional time-to-live and hit/miss counters"""
+    
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > self._now()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+    
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = self._now() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def _now(self):
+        """Clock the expiry times are measured on"""
+        return time.monotonic()
+    
+    def discard(self, key):
+        """Drop one entry if it is cached"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop every entry; the counters are kept"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Return size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
 class PerformanceAnalytics:
-    def __init__(self, data_path='data'):
+    def __init__(self, data_path='data', interaction_retention_days=INTERACTION_RETENTION_DAYS):
         """Initialize the analytics class with data files"""
         self.data_path = data_path
+        self.interaction_retention_days = interaction_retention_days
+        self._ingest_lock = threading.RLock()
         self.students = None
         self.enrollments = None
         self.performance = None
         self.interactions = None
+        self.activity = None
+        self.activity_students = None
+        self.activity_histogram = None
+        self.activity_origin = None
+        self._activity_prefix = None
+        self.activity_version = 0
         self.feedback = None
         self.courses = None
+        self.student_courses = None
+        self.indexes = {}
+        self.course_aggregates = {}
+        self.score_distributions = {}
+        self.dataset_signature = None
+        self.dataset_version = None
+        self.load_error = None
+        self.student_cache = LRUCache(maxsize=STUDENT_CACHE_SIZE, ttl=STUDENT_CACHE_TTL)
+        self.instructor_cache = LRUCache(maxsize=INSTRUCTOR_CACHE_SIZE)
+        self.dashboard_cache = LRUCache(maxsize=DASHBOARD_CACHE_SIZE, ttl=DASHBOARD_CACHE_TTL)
+        self.dashboard_course_cache = LRUCache(maxsize=DASHBOARD_CACHE_SIZE)
+        self.dashboards_version = None
+        self.dashboard_store_mtime = None
         self.load_data()
         self.at_risk_model = None
+        self.risk_model_mtime = None
+        self.load_risk_model()
         
     def load_data(self):
         """Load all data files"""
+        # Taken before reading, so a change made during the load is noticed later
+        signature = dataset_signature(self.data_path)
         try:
-            self.students = pd.read_csv(os.path.join(self.data_path, 'students.csv'))
-            self.enrollments = pd.read_csv(os.path.join(self.data_path, 'enrollments.csv'))
-            self.performance = pd.read_csv(os.path.join(self.data_path, 'performance.csv'))
-            self.interactions = pd.read_csv(os.path.join(self.data_path, 'interactions.csv'))
-            self.feedback = pd.read_csv(os.path.join(self.data_path, 'feedback.csv'))
-            self.courses = pd.read_csv(os.path.join(self.data_path, 'courses.csv'))
+            self.students = read_table(self.data_path, 'students')
+            self.enrollments = read_table(self.data_path, 'enrollments')
+            self.performance = read_table(self.data_path, 'performance')
+            self.interactions = read_interactions(self.data_path, retention_days=self.interaction_retention_days)
+            self.feedback = read_table(self.data_path, 'feedback')
+            self.courses = read_table(self.data_path, 'courses')
             
-            # Convert timestamp to datetime
-            if 'timestamp' in self.interactions.columns:
-                self.interactions['timestamp'] = pd.to_datetime(self.interactions['timestamp'])
-                
-            # Convert enrollment_date to datetime
-            if 'enrollment_date' in self.students.columns:
-                self.students['enrollment_date'] = pd.to_datetime(self.students['enrollment_date'])
+            self.build_student_courses()
+            self.build_indexes()
+            self.build_course_aggregates()
+            self.build_score_distributions()
+            self.build_activity_counters()
+            self.build_activity_histogram()
             
+            self.dataset_signature = signature
+            self.dataset_version = hashlib.sha1(repr(signature).encode()).hexdigest()[:12]
+            self.load_error = None
+            self.student_cache.clear()
+            self.instructor_cache.clear()
             print("Data loaded successfully!")
         except Exception as e:
+            self.load_error = str(e)
             print(f"Error loading data: {e}")
     
+    @property
+    def interactions(self):
+        """Interaction log, including the events added by ingest_interactions"""
+        if self._interaction_chunks:
+            with self._ingest_lock:
+                if self._interaction_chunks:
+                    self._interactions = concat_interactions([self._interactions] + self._interaction_chunks)
+                    self._interaction_chunks = []
+        return self._interactions
+    
+    @interactions.setter
+    def interactions(self, frame):
+        self._interactions = frame
+        self._interaction_chunks = []
+        self._ingested_rows = 0
+    
+    def ingested_interactions(self):
+        """
+        Events added by ingest_interactions since the data was loaded
+        They are not in the data files, so a reload carries them over
+        """
+        with self._ingest_lock:
+            if not self._ingested_rows:
+                return self.interactions.iloc[0:0]
+            # Ingested events are always appended, so they are the tail of the log
+            return self.interactions.iloc[-self._ingested_rows:]
+    
+    def build_activity_counters(self):
+        """Count each student's interactions, logins and session minutes"""
+        with self._ingest_lock:
+            self.activity = self._count_activity(self.interactions)
+    
+    def _count_activity(self, interactions):
+        """Per-student activity counters for a block of interaction events"""
+        is_login = interactions['interaction_type'] == 'Login'
+        login_minutes = interactions['duration_minutes'].where(is_login).astype('float64')
+        counts = pd.DataFrame({
+            'total_interactions': 1,
+            'login_count': is_login.astype('int64'),
+            'login_minutes': login_minutes.fillna(0),
+            'timed_logins': login_minutes.notna().astype('int64')
+        }, index=interactions.index)
+        counts = counts.groupby(interactions['student_id'], sort=False, observed=True).sum()
+        counts.index = pd.Index(np.asarray(counts.index), name='student_id')
+        return counts
+    
+    def build_activity_histogram(self, days=ACTIVITY_HISTORY_DAYS):
+        """
+        Bucket the interaction log into a students x days array of uint16 event counts
+        Column 0 is the day `days` days before today, so a window of up to `days`
+        days fits; later events (up to the newest one in the log) get their own
+        columns, older ones are left out.
+        """
+        origin = pd.Timestamp(datetime.now()).normalize() - pd.Timedelta(days=days)
+        with self._ingest_lock:
+            interactions = self.interactions
+            students = pd.Index(np.asarray(interactions['student_id'].unique()))
+            rows, day = self._activity_buckets(interactions, students, origin)
+            
+            width = max(days + 1, int(day.max()) + 1 if len(day) else 0)
+            cells, counts = np.unique(rows * width + day, return_counts=True)
+            histogram = np.zeros((len(students), width), dtype=np.uint16)
+            histogram.flat[cells] = np.minimum(counts, ACTIVITY_COUNT_MAX)
+            
+            self.activity_students = students
+            self.activity_histogram = histogram
+            self.activity_origin = origin
+            self._activity_prefix = None
+    
+    def _activity_buckets(self, interactions, students, origin):
+        """Histogram row and day column of each event on or after origin"""
+        stamps = pd.to_datetime(interactions['timestamp']).to_numpy(dtype='datetime64[ns]')
+        day = (stamps.astype('datetime64[D]') - np.datetime64(origin, 'D')).astype(np.int64)
+        rows = students.get_indexer(interactions['student_id'])
+        keep = ~np.isnat(stamps) & (day >= 0) & (rows >= 0)
+        return rows[keep], day[keep]
+    
+    def count_recent_activity(self, days=RECENT_ACTIVITY_DAYS, student_ids=None):
+        """
+        Count each student's interactions over the last `days` days
+        The window is day-granular: it starts at midnight of the day `days` days ago.
+        Returns a Series indexed by student_id, for every student in the log or for
+        the given student_ids (NaN for students with no interactions at all).
+        """
+        window_start = (pd.Timestamp(datetime.now()) - pd.Timedelta(days=days)).normalize()
+        with self._ingest_lock:
+            # Rebuilt only when the history has fallen behind today (a new day began)
+            if self.activity_histogram is None or (days <= ACTIVITY_HISTORY_DAYS and window_start < self.activity_origin):
+                self.build_activity_histogram()
+            histogram = self.activity_histogram
+            
+            if window_start < self.activity_origin:
+                # Longer than the kept history: counted from the log, without storing it
+                per_student = self._count_events_since(window_start)
+            elif student_ids is None:
+                # Whole cohort: one subtraction per student on the running prefix sums
+                first_day = min((window_start - self.activity_origin).days, histogram.shape[1])
+                prefix = self._activity_prefix_sums()
+                per_student = prefix[:, -1].astype(np.int64) - prefix[:, first_day]
+            else:
+                per_student = None
+            
+            if student_ids is None:
+                return pd.Series(per_student, index=self.activity_students, name='recent_activity_count')
+            
+            student_ids = pd.Index(student_ids)
+            rows = self.activity_students.get_indexer(student_ids)
+            counts = np.full(len(student_ids), np.nan)
+            found = rows >= 0
+            if per_student is not None:
+                counts[found] = per_student[rows[found]]
+            else:
+                # A few students: summing their rows beats building the prefix sums
+                first_day = min((window_start - self.activity_origin).days, histogram.shape[1])
+                counts[found] = histogram[rows[found], first_day:].sum(axis=1)
+            return pd.Series(counts, index=student_ids, name='recent_activity_count')
+    
+    def _activity_prefix_sums(self):
+        """Running int32 totals along each histogram row, with a leading zero column"""
+        if self._activity_prefix is None:
+            histogram = self.activity_histogram
+            prefix = np.zeros((histogram.shape[0], histogram.shape[1] + 1), dtype=np.int32)
+            np.cumsum(histogram, axis=1, dtype=np.int32, out=prefix[:, 1:])
+            self._activity_prefix = prefix
+        return self._activity_prefix
+    
+    def _count_events_since(self, window_start):
+        """Events since window_start per histogram row, counted from the whole log"""
+        interactions = self.interactions
+        stamps = pd.to_datetime(interactions['timestamp']).to_numpy(dtype='datetime64[ns]')
+        rows = self.activity_students.get_indexer(interactions['student_id'])
+        keep = (stamps >= np.datetime64(window_start, 'ns')) & (rows >= 0)
+        return np.bincount(rows[keep], minlength=len(self.activity_students)).astype(np.int64)
+    
+    def ingest_interactions(self, batch):
+        """
+        Append interaction events (a DataFrame or a list of dicts with the
+        interactions.csv columns) without reloading the log.
+        Events without a timestamp are stamped with the current time.
+        The activity counters and histogram are updated in place and the affected
+        students' cached metrics are dropped. Returns the number of events added.
+        """
+        events = pd.DataFrame(batch).reindex(columns=INTERACTION_COLUMNS)
+        if events.empty:
+            return 0
+        events['timestamp'] = pd.to_datetime(events['timestamp']).fillna(pd.Timestamp(datetime.now()))
+        events = compact_interactions(events)
+        
+        with self._ingest_lock:
+            batch_counts = self._count_activity(events)
+            activity = self.activity.add(batch_counts, fill_value=0)
+            self.activity = activity.astype(self.activity.dtypes.to_dict())
+            self._add_to_histogram(events)
+            self._interaction_chunks.append(events)
+            self._ingested_rows += len(events)
+            self.activity_version += 1
+        
+        for student_id in batch_counts.index:
+            self.student_cache.discard((self.dataset_version, student_id))
+        
+        return len(events)
+    
+    def _add_to_histogram(self, events):
+        """Add a batch of events to the activity histogram, growing it as needed"""
+        new_students = pd.Index(np.asarray(events['student_id'].unique())).difference(self.activity_students, sort=False)
+        students = self.activity_students.append(new_students)
+        rows, day = self._activity_buckets(events, students, self.activity_origin)
+        
+        histogram = self.activity_histogram
+        width = max(int(day.max()) + 1 if len(day) else 0, histogram.shape[1])
+        extra_days = width - histogram.shape[1]
+        if len(new_students) or extra_days:
+            histogram = np.pad(histogram, ((0, len(new_students)), (0, extra_days)))
+        
+        # Added in int64 and clipped, so a busy day saturates instead of wrapping around
+        cells, counts = np.unique(rows * width + day, return_counts=True)
+        histogram.flat[cells] = np.minimum(histogram.flat[cells].astype(np.int64) + counts, ACTIVITY_COUNT_MAX)
+        
+        # Keep the prefix sums current: untouched rows only grow by repeating their
+        # total, so just the rows of this batch are summed again
+        prefix = self._activity_prefix
+        if prefix is not None:
+            if extra_days:
+                prefix = np.pad(prefix, ((0, 0), (0, extra_days)), mode='edge')
+            if len(new_students):
+                prefix = np.pad(prefix, ((0, len(new_students)), (0, 0)))
+            touched = np.unique(rows)
+            prefix[touched, 1:] = np.cumsum(histogram[touched], axis=1, dtype=np.int32)
+        
+        self.activity_students = students
+        self.activity_histogram = histogram
+        self._activity_prefix = prefix
+    
+    def build_student_courses(self):
+        """
+        Join each enrollment with the first performance record for its course,
+        giving one row per (student_id, course_code) enrollment with its scores
+        """
+        enrollment_columns = ['student_id', 'course_code', 'course_name', 'trimester', 'instructor', 'status']
+        course_perf = widen_scores(self.performance.drop_duplicates(subset=['student_id', 'course_code']))
+        self.student_courses = self.enrollments[enrollment_columns].merge(course_perf, on=['student_id', 'course_code'], how='inner')
+    
+    def build_indexes(self):
+        """
+        Build row-position lookups for the indexed columns of each table
+        so accessors can slice one key without scanning the whole table
+        """
+        indexes = {}
+        for table, columns in INDEXED_COLUMNS.items():
+            frame = getattr(self, table)
+            indexes[table] = {
+                column: frame.groupby(column, sort=False, observed=True).indices
+                for column in columns if column in frame.columns
+            }
+        self.indexes = indexes
+    
+    def _rows(self, table, column, key):
+        """Return the rows of a table whose column equals key, in table order"""
+        frame = getattr(self, table)
+        positions = self.indexes[table][column].get(key)
+        if positions is None:
+            return frame.iloc[0:0]
+        return frame.iloc[positions]
+    
+    def _rows_for_keys(self, table, column, keys):
+        """Return the rows of a table whose column is any of keys, in table order"""
+        frame = getattr(self, table)
+        index = self.indexes[table][column]
+        positions = [index[key] for key in keys if key in index]
+        if not positions:
+            return frame.iloc[0:0]
+        return frame.iloc[np.sort(np.concatenate(positions))]
+    
+    def build_course_aggregates(self):
+        """
+        Summarize every course once, in a single pass over the performance groups,
+        so per-course lookups do not rescan performance and feedback
+        """
+        aggregates = {}
+        for course_code, course_perf in widen_scores(self.performance).groupby('course_code', sort=False, observed=True):
+            course_feedback = self._rows('feedback', 'course_code', course_code)
+            aggregates[course_code] = self.summarize_course_rows(course_perf, course_feedback)
+        self.course_aggregates = aggregates
+    
+    def build_score_distributions(self):
+        """Keep each course's total scores as a sorted array, for exact percentiles"""
+        scores = self.performance[['course_code', 'total_score']].dropna()
+        self.score_distributions = {
+            course_code: np.sort(group['total_score'].to_numpy(dtype=float))
+            for course_code, group in scores.groupby('course_code', sort=False, observed=True)
+        }
+    
+    def get_score_percentiles(self, course_code, scores):
+        """
+        Percentile rank (0-100) of each score among the course's total scores
+        Tied scores count half, so the median student sits at 50. Returns an array
+        with NaN for missing scores, or all NaN if the course has no scores.
+        """
+        scores = np.asarray(scores, dtype=float)
+        distribution = self.score_distributions.get(course_code)
+        if distribution is None or len(distribution) == 0:
+            return np.full(scores.shape, np.nan)
+        below = np.searchsorted(distribution, scores, side='left')
+        at_or_below = np.searchsorted(distribution, scores, side='right')
+        percentiles = (below + at_or_below) / 2 / len(distribution) * 100
+        return np.where(np.isnan(scores), np.nan, percentiles)
+    
+    def get_score_percentile(self, course_code, score):
+        """Percentile rank of one total score in a course, rounded to 0.1, or None"""
+        if score is None:
+            return None
+        percentile = self.get_score_percentiles(course_code, [score])[0]
+        return None if np.isnan(percentile) else round(float(percentile), 1)
+    
+    def get_class_percentiles(self, course_code):
+        """Percentile rank of every student with a total score in a course, by student_id"""
+        course_perf = self._rows('performance', 'course_code', course_code).dropna(subset=['total_score'])
+        percentiles = self.get_score_percentiles(course_code, course_perf['total_score'])
+        return dict(zip(course_perf['student_id'].astype('str'), np.round(percentiles, 1).tolist()))
+    
     def get_course_performance(self, course_code=None, instructor=None):
         """
         Get performance metrics for a specific course or all courses taught by an instructor
         Returns a dict with various metrics
         """
         if course_code:
-            # Filter data for the specific course
-            course_perf = self.performance[self.performance['course_code'] == course_code]
-            course_enroll = self.enrollments[self.enrollments['course_code'] == course_code]
+            course_enroll = self._rows('enrollments', 'course_code', course_code)
             course_name = course_enroll['course_name'].iloc[0] if not course_enroll.empty else "Unknown Course"
             instructor_name = course_enroll['instructor'].iloc[0] if not course_enroll.empty else "Unknown Instructor"
             
-            # Get relevant feedback
-            course_feedback = self.feedback[self.feedback['course_code'] == course_code]
+            # Per-course figures are precomputed when the data loads
+            summary = self.course_aggregates.get(course_code)
             
         elif instructor:
-            # Filter data for all courses taught by the instructor
-            instructor_courses = self.enrollments[self.enrollments['instructor'] == instructor]
-            course_codes = instructor_courses['course_code'].unique()
-            
-            course_perf = self.performance[self.performance['course_code'].isin(course_codes)]
-            course_enroll = instructor_courses
             instructor_name = instructor
             course_name = "All Courses"
             
-            # Get relevant feedback
-            course_feedback = self.feedback[self.feedback['instructor'] == instructor]
+            # Summaries over all of an instructor's courses are cached per dataset version
+            summary = self.get_instructor_summary(instructor)
         
         else:
             # If neither course_code nor instructor provided, return empty results
             return {}
         
         # If no performance data found, return empty results
-        if course_perf.empty:
+        if summary is None:
             return {
                 'course_code': course_code,
                 'course_name': course_name,
@@ -85,16 +573,57 @@ class PerformanceAnalytics:
                 'error': 'No performance data found for this course'
             }
         
-        # Calculate performance metrics
         metrics = {}
         metrics['course_code'] = course_code
         metrics['course_name'] = course_name
         metrics['instructor'] = instructor_name
-        metrics['num_students'] = len(course_perf)
+        metrics.update(copy.deepcopy(summary))
+        
+        metrics['insights'] = self.generate_course_insights(metrics)
+        
+        return metrics
+    
+    def get_instructor_summary(self, instructor):
+        """
+        Summarize the performance and feedback rows of all courses taught by an
+        instructor, or return None if there are none. Cached per dataset version;
+        the returned dict is shared and should not be modified by callers.
+        """
+        cache_key = (self.dataset_version, instructor)
+        summary = self.instructor_cache.get(cache_key, default=False)
+        if summary is not False:
+            return summary
         
-        # Average scores
-        quiz_columns = ['quiz1', 'quiz2']
-        assignment_columns = [f'assignment{i}' for i in range(1, 13)]
+        # Filter data for all courses taught by the instructor
+        instructor_courses = self._rows('enrollments', 'instructor', instructor)
+        course_codes = instructor_courses['course_code'].unique()
+        course_perf = self._rows_for_keys('performance', 'course_code', course_codes)
+        
+        # Get relevant feedback
+        course_feedback = self._rows('feedback', 'instructor', instructor)
+        
+        summary = self.summarize_course_rows(course_perf, course_feedback) if not course_perf.empty else None
+        self.instructor_cache.set(cache_key, summary)
+        return summary
+    
+    def cache_stats(self):
+        """Size and hit/miss counters of each result cache"""
+        return {
+            'dataset_version': self.dataset_version,
+            'student_metrics': self.student_cache.stats(),
+            'instructor_summaries': self.instructor_cache.stats(),
+            'instructor_dashboards': self.dashboard_cache.stats(),
+            'instructor_dashboard_courses': self.dashboard_course_cache.stats()
+        }
+    
+    def summarize_course_rows(self, course_perf, course_feedback):
+        """
+        Calculate score, grade, attendance and feedback metrics over a set of
+        performance and feedback rows
+        """
+        course_perf = widen_scores(course_perf)
+        metrics = {}
+        metrics['num_students'] = len(course_perf)
         
         # Handle NaN values (for ongoing courses)
         metrics['avg_quiz1'] = course_perf['quiz1'].dropna().mean() if 'quiz1' in course_perf else None
@@ -114,7 +643,8 @@ class PerformanceAnalytics:
         
         # Grade distribution
         if 'grade' in course_perf:
-            grade_counts = course_perf['grade'].value_counts().to_dict()
+            # Counted as strings: a categorical would also list grades nobody got
+            grade_counts = course_perf['grade'].dropna().astype('str').value_counts().to_dict()
             metrics['grade_distribution'] = grade_counts
             
             # Calculate success rate (students who passed)
@@ -143,52 +673,63 @@ class PerformanceAnalytics:
             # Sentiment analysis (simple version based on ratings)
             metrics['sentiment'] = 'Positive' if metrics['avg_course_rating'] >= 4 else ('Neutral' if metrics['avg_course_rating'] >= 3 else 'Negative')
         
-        # Insights for course progress
-        metrics['insights'] = []
+        return metrics
+    
+    def generate_course_insights(self, metrics):
+        """Generate insights for course progress from course metrics"""
+        insights = []
         
         # Low engagement insight
         if metrics.get('avg_attendance', 0) < 80:
-            metrics['insights'].append("Low overall attendance detected. Consider engagement strategies.")
+            insights.append("Low overall attendance detected. Consider engagement strategies.")
         
         # Performance drop between quiz1 and quiz2
         if metrics.get('avg_quiz1') and metrics.get('avg_quiz2'):
             if metrics['avg_quiz1'] - metrics['avg_quiz2'] > 10:
-                metrics['insights'].append("Significant performance drop between Quiz 1 and Quiz 2. Review teaching materials for middle part of the course.")
+                insights.append("Significant performance drop between Quiz 1 and Quiz 2. Review teaching materials for middle part of the course.")
         
         # Difficulty with assignments
         if metrics.get('avg_assignment_score', 0) < 65:
-            metrics['insights'].append("Students are struggling with assignments. Consider providing additional practice or resources.")
+            insights.append("Students are struggling with assignments. Consider providing additional practice or resources.")
         
         # End-term exam results
         if metrics.get('avg_endterm', 0) < 60:
-            metrics['insights'].append("End-term exam results are concerning. Review exam structure and preparation materials.")
+            insights.append("End-term exam results are concerning. Review exam structure and preparation materials.")
         
         # Feedback insights
         if metrics.get('avg_instructor_rating', 0) < metrics.get('avg_course_rating', 0) - 0.5:
-            metrics['insights'].append("Instructor ratings are lower than course content ratings. Consider reviewing teaching methods.")
+            insights.append("Instructor ratings are lower than course content ratings. Consider reviewing teaching methods.")
         
         # Calculate performance trends across assignments
         if all(f'avg_assignment{i}' in metrics for i in range(1, 6)):
             assignment_scores = [metrics[f'avg_assignment{i}'] for i in range(1, 6)]
             if assignment_scores[0] > assignment_scores[-1] + 5:
-                metrics['insights'].append("Declining performance trend across assignments. Consider adjusting difficulty curve.")
-                
-
-        return metrics
+                insights.append("Declining performance trend across assignments. Consider adjusting difficulty curve.")
+        
+        return insights
     
     def get_student_performance(self, student_id):
         """
         Get performance metrics for a specific student
-        Returns a dict with various metrics
+        Returns a dict with various metrics. Results are cached per dataset version,
+        so the returned dict is shared and should not be modified by callers.
         """
+        cache_key = (self.dataset_version, student_id)
+        metrics = self.student_cache.get(cache_key)
+        if metrics is None:
+            metrics = self._compute_student_performance(student_id)
+            self.student_cache.set(cache_key, metrics)
+        return metrics
+    
+    def _compute_student_performance(self, student_id):
+        """Compute the metrics returned by get_student_performance"""
         # Filter data for the student
-        student_info = self.students[self.students['student_id'] == student_id]
+        student_info = self._rows('students', 'student_id', student_id)
         if student_info.empty:
             return {'error': 'Student not found'}
         
-        student_enroll = self.enrollments[self.enrollments['student_id'] == student_id]
-        student_perf = self.performance[self.performance['student_id'] == student_id]
-        student_interact = self.interactions[self.interactions['student_id'] == student_id]
+        student_enroll = self._rows('enrollments', 'student_id', student_id)
+        student_perf = widen_scores(self._rows('performance', 'student_id', student_id))
         
         # If no data found, return basic student info
         if student_enroll.empty or student_perf.empty:
@@ -216,41 +757,26 @@ class PerformanceAnalytics:
         total_grade_points = 0
         total_credits = 0
         
-        for _, course in student_enroll.iterrows():
-            course_code = course['course_code']
-            course_name = course['course_name']
-            
-            # Get performance data for this course
-            course_perf = student_perf[student_perf['course_code'] == course_code]
+        # Enrollments joined with their performance record, one dict per course
+        student_courses = self._rows('student_courses', 'student_id', student_id)
+        
+        for course_data in student_courses.drop(columns='student_id').to_dict('records'):
+            course_code = course_data['course_code']
             
-            if not course_perf.empty:
-                course_data = {
-                    'course_code': course_code,
-                    'course_name': course_name,
-                    'trimester': course['trimester'],
-                    'instructor': course['instructor'],
-                    'status': course['status']
-                }
-                
-                # Add scores if available
-                for col in course_perf.columns:
-                    if col not in ['student_id', 'course_code']:
-                        course_data[col] = course_perf[col].iloc[0]
-                
-                # Add to appropriate list
-                if course['status'] == 'Ongoing':
-                    metrics['ongoing_courses'].append(course_data)
-                else:
-                    metrics['completed_courses'].append(course_data)
-                    
-                    # For completed courses, add to GPA calculation
-                    if 'grade_point' in course_data and course_data['grade_point'] is not None:
-                        # Assuming all courses are 4 credits
-                        total_grade_points += course_data['grade_point'] * 4
-                        total_credits += 4
+            # Add to appropriate list
+            if course_data['status'] == 'Ongoing':
+                metrics['ongoing_courses'].append(course_data)
+            else:
+                metrics['completed_courses'].append(course_data)
                 
-                # Add to courses dict
-                metrics['courses'][course_code] = course_data
+                # For completed courses, add to GPA calculation
+                if 'grade_point' in course_data and course_data['grade_point'] is not None:
+                    # Assuming all courses are 4 credits
+                    total_grade_points += course_data['grade_point'] * 4
+                    total_credits += 4
+            
+            # Add to courses dict
+            metrics['courses'][course_code] = course_data
         
         # Calculate GPA
         metrics['calculated_gpa'] = total_grade_points / total_credits if total_credits > 0 else 0
@@ -262,21 +788,19 @@ class PerformanceAnalytics:
         if 'attendance_percentage' in student_perf.columns:
             metrics['avg_attendance'] = student_perf['attendance_percentage'].mean()
         
-        # System interactions
-        if not student_interact.empty:
-            metrics['total_interactions'] = len(student_interact)
-            metrics['login_count'] = student_interact[student_interact['interaction_type'] == 'Login'].shape[0]
+        # System interactions, from the running activity counters
+        activity = self.activity
+        if student_id in activity.index:
+            student_activity = activity.loc[student_id]
+            metrics['total_interactions'] = int(student_activity['total_interactions'])
+            metrics['login_count'] = int(student_activity['login_count'])
             
             # Activity over time (last 30 days)
-            today = datetime.now()
-            thirty_days_ago = today - pd.Timedelta(days=30)
-            recent_interactions = student_interact[student_interact['timestamp'] >= thirty_days_ago]
-            metrics['recent_activity_count'] = len(recent_interactions)
+            metrics['recent_activity_count'] = int(self.count_recent_activity(student_ids=[student_id]).iloc[0])
             
             # Average session duration
-            login_sessions = student_interact[student_interact['interaction_type'] == 'Login']
-            if 'duration_minutes' in login_sessions.columns:
-                metrics['avg_session_minutes'] = login_sessions['duration_minutes'].mean()
+            timed_logins = student_activity['timed_logins']
+            metrics['avg_session_minutes'] = student_activity['login_minutes'] / timed_logins if timed_logins else np.nan
         
         # Generate insights
         metrics['insights'] = []
@@ -293,16 +817,17 @@ class PerformanceAnalytics:
         ongoing_course_count = len(metrics['ongoing_courses'])
         if ongoing_course_count > 0:
             # Check if quiz1 is done for most courses
-            quiz1_completed = sum(1 for course in metrics['ongoing_courses'] if course.get('quiz1') is not None)
+            quiz1_completed = sum(1 for course in metrics['ongoing_courses'] if pd.notna(course.get('quiz1')))
             if quiz1_completed / ongoing_course_count < 0.5:
-                metrics['insights'].append("Student is falling behind in current trimester assessments.")
+                metrics['insights'].append(FALLING_BEHIND_INSIGHT)
         
         # Engagement insights
         if metrics.get('recent_activity_count', 100) < 5:
             metrics['insights'].append("Low platform engagement in the last 30 days. Outreach recommended.")
         
         # At-risk prediction
-        risk_score = self.predict_student_risk(metrics)
+        risk_features = self.build_risk_features(student_perf).dropna(subset=['quiz1', 'attendance_percentage']).mean()
+        risk_score = self.predict_student_risk(metrics, features=risk_features)
         metrics['risk_score'] = risk_score
         
         if risk_score > 0.7:
@@ -316,6 +841,53 @@ class PerformanceAnalytics:
 
         return metrics
     
+    def build_course_comparison(self, course_record, course_code):
+        """
+        Compare a student's record in one course (an entry of get_student_performance's
+        course lists) with the class averages precomputed for the course
+        """
+        summary = self.course_aggregates.get(course_code) or {}
+        return {
+            'course_code': course_code,
+            'course_name': course_record.get('course_name', 'Unknown Course'),
+            'student_performance': {
+                'quiz1': course_record.get('quiz1'),
+                'quiz2': course_record.get('quiz2'),
+                'endterm': course_record.get('endterm'),
+                'attendance': course_record.get('attendance_percentage'),
+                'total_score': course_record.get('total_score'),
+                'grade': course_record.get('grade')
+            },
+            'class_average': {
+                'quiz1': summary.get('avg_quiz1'),
+                'quiz2': summary.get('avg_quiz2'),
+                'endterm': summary.get('avg_endterm'),
+                'attendance': summary.get('avg_attendance'),
+                'pass_rate': summary.get('pass_rate')
+            },
+            'percentile': self.get_score_percentile(course_code, course_record.get('total_score'))
+        }
+    
+    def get_course_comparisons(self, student_id):
+        """
+        Compare the student with the class in every course they are enrolled in,
+        from a single get_student_performance lookup
+        Returns a list of comparisons, or None if the student has no course data
+        """
+        student_data = self.get_student_performance(student_id)
+        if 'error' in student_data:
+            return None
+        
+        comparisons = []
+        seen = set()
+        for course in student_data.get('ongoing_courses', []) + student_data.get('completed_courses', []):
+            course_code = course.get('course_code')
+            if course_code in seen:
+                continue
+            seen.add(course_code)
+            comparisons.append(self.build_course_comparison(course, course_code))
+        return comparisons
+    
     def calculate_performance_trend(self, student_perf):
         """Calculate the performance trend for a student over time"""
         if student_perf.empty:
@@ -353,14 +925,55 @@ class PerformanceAnalytics:
         
         return "Unable to determine trend"
     
-    def predict_student_risk(self, student_metrics):
+    def build_risk_features(self, performance):
+        """
+        Build the risk model features for each performance record:
+        quiz1, attendance and the mean of the first three assignments (0 if none)
+        """
+        assignment_columns = [f'assignment{i}' for i in range(1, 4)]
+        return pd.DataFrame({
+            'quiz1': performance['quiz1'],
+            'attendance_percentage': performance['attendance_percentage'],
+            'assignment_mean': performance[assignment_columns].mean(axis=1).fillna(0)
+        }, index=performance.index, columns=RISK_FEATURES)
+    
+    def predict_model_risk(self, features):
+        """
+        Score a feature frame (one row per student) with the trained risk model
+        in a single predict_proba call. Returns a Series of at-risk probabilities,
+        NaN for rows with incomplete features, or None if no model is trained.
+        """
+        if self.at_risk_model is None:
+            return None
+        
+        scores = pd.Series(np.nan, index=features.index, dtype=float)
+        complete = features[RISK_FEATURES].dropna()
+        if complete.empty:
+            return scores
+        
+        model = self.at_risk_model['model']
+        X = self.at_risk_model['scaler'].transform(complete.to_numpy(dtype=float))
+        classes = list(model.classes_)
+        if 1 in classes:
+            scores[complete.index] = model.predict_proba(X)[:, classes.index(1)]
+        else:
+            # The model never saw an at-risk example
+            scores[complete.index] = 0.0
+        return scores
+    
+    def predict_student_risk(self, student_metrics, features=None):
         """
-        A simplified risk model that predicts likelihood of student academic issues
+        Predict the likelihood of student academic issues
+        Uses the trained risk model when one exists and the student's model features
+        are complete; otherwise falls back to a rule-based score.
         Returns a risk score between 0 and 1
         """
-        # If we haven't trained a model, use a rule-based approach
-        # In a real system, this would be replaced with a trained ML model
+        if features is not None and self.at_risk_model is not None:
+            model_score = self.predict_model_risk(pd.DataFrame([features]))
+            if pd.notna(model_score.iloc[0]):
+                return float(model_score.iloc[0])
         
+        # Rule-based score
         risk_score = 0
         
         # Attendance factor
@@ -393,63 +1006,37 @@ class PerformanceAnalytics:
         
         return risk_score
     
-    def train_risk_prediction_model(self):
+    def train_risk_prediction_model(self, persist=False, n_jobs=None):
         """
         Train a machine learning model to predict at-risk students
-        This is a placeholder for a more sophisticated implementation
+        n_jobs is passed to the RandomForest to fit trees in parallel (-1 uses all cores).
+        With persist=True the model is also saved for other workers and restarts
         """
         # In a real implementation, this would train a model based on historical data
         # For this prototype, we'll create a simple RandomForest classifier
         
         # First, prepare training data from our synthetic data
         # We'll use completed courses as our training data
-        completed_courses = self.performance.dropna(subset=['grade'])
+        completed_courses = widen_scores(self.performance.dropna(subset=['grade']))
         
         if completed_courses.empty:
             print("No completed courses found for training")
             return None
         
-        # Create features: quiz scores, attendance, assignment averages
-        features = []
-        targets = []  # 1 for at-risk (grade D or F), 0 for not at-risk
+        # Skip rows with missing key data
+        completed_courses = completed_courses.dropna(subset=['quiz1', 'attendance_percentage'])
         
-        for _, row in completed_courses.iterrows():
-            # Skip rows with missing key data
-            if pd.isna(row.get('quiz1')) or pd.isna(row.get('attendance_percentage')):
-                continue
-                
-            # Feature vector: quiz1, avg of first 3 assignments, attendance
-            feature_vector = [
-                row.get('quiz1', 0),
-                row.get('attendance_percentage', 0)
-            ]
-            
-            # Add available assignment scores
-            assignment_scores = []
-            for i in range(1, 4):
-                col = f'assignment{i}'
-                if col in row and not pd.isna(row[col]):
-                    assignment_scores.append(row[col])
-            
-            if assignment_scores:
-                feature_vector.append(sum(assignment_scores) / len(assignment_scores))
-            else:
-                feature_vector.append(0)
-            
-            # Target: at-risk if grade is D or F
-            grade = row.get('grade')
-            is_at_risk = 1 if grade in ['D', 'E', 'F'] else 0
-            
-            features.append(feature_vector)
-            targets.append(is_at_risk)
-        
-        if not features:
+        if completed_courses.empty:
             print("No valid features found for training")
             return None
         
-        # Convert to numpy arrays
-        X = np.array(features)
-        y = np.array(targets)
+        # Feature matrix: quiz1, attendance, avg of first 3 assignments
+        X = self.build_risk_features(completed_courses).to_numpy(dtype=float)
+        
+        # Target: at-risk if grade is D, E or F
+        y = completed_courses['grade'].isin(['D', 'E', 'F']).astype(int).to_numpy()
+        
+        start_time = time.perf_counter()
         
         # Train-test split
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -460,26 +1047,98 @@ class PerformanceAnalytics:
         X_test = scaler.transform(X_test)
         
         # Train model
-        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs)
         model.fit(X_train, y_train)
         
         # Evaluate
         accuracy = model.score(X_test, y_test)
-        print(f"Risk prediction model trained with accuracy: {accuracy:.2f}")
+        training_seconds = time.perf_counter() - start_time
+        print(f"Risk prediction model trained with accuracy: {accuracy:.2f} in {training_seconds:.2f}s")
         
         # Save model and scaler for later use
         self.at_risk_model = {
             'model': model,
             'scaler': scaler,
-            'accuracy': accuracy
+            'accuracy': accuracy,
+            'training_rows': len(X),
+            'training_seconds': training_seconds,
+            'dataset_version': self.dataset_version,
+            'trained_at': datetime.now().isoformat()
         }
         
+        # Cached student metrics hold risk scores from the previous model
+        self.student_cache.clear()
+        
+        if persist:
+            self.save_risk_model()
+        
         return self.at_risk_model
     
+    def save_risk_model(self):
+        """Write the trained risk model and its metadata to the dataset directory"""
+        model_path = os.path.join(self.data_path, RISK_MODEL_FILE)
+        tmp_path = f'{model_path}.tmp{os.getpid()}'
+        artifact = dict(self.at_risk_model, version=RISK_MODEL_VERSION)
+        
+        # Uncompressed, so the tree arrays can be memory-mapped when loaded
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, model_path)
+        self.risk_model_mtime = os.path.getmtime(model_path)
+        print(f"Risk prediction model saved to {model_path}")
+    
+    def load_risk_model(self):
+        """
+        Load the saved risk model, if there is one for the current artifact version
+        Returns True if a model was loaded
+        """
+        model_path = os.path.join(self.data_path, RISK_MODEL_FILE)
+        if not os.path.exists(model_path):
+            return False
+        
+        try:
+            mtime = os.path.getmtime(model_path)
+            artifact = joblib.load(model_path, mmap_mode='r')
+        except Exception as e:
+            print(f"Error loading risk model: {e}")
+            return False
+        
+        if artifact.get('version') != RISK_MODEL_VERSION:
+            print(f"Ignoring risk model artifact version {artifact.get('version')}, expected {RISK_MODEL_VERSION}")
+            return False
+        
+        if artifact.get('dataset_version') != self.dataset_version:
+            print("Loaded risk model was trained on a different version of the dataset")
+        
+        self.at_risk_model = {key: value for key, value in artifact.items() if key != 'version'}
+        self.risk_model_mtime = mtime
+        self.student_cache.clear()
+        return True
+    
+    def refresh_risk_model(self):
+        """Load the saved risk model again if another process has replaced it"""
+        model_path = os.path.join(self.data_path, RISK_MODEL_FILE)
+        try:
+            mtime = os.path.getmtime(model_path)
+        except OSError:
+            return False
+        if mtime != self.risk_model_mtime:
+            return self.load_risk_model()
+        return False
+    
     def get_instructor_dashboard_data(self, instructor_name):
         """Get comprehensive data for an instructor dashboard"""
+        dashboard = self.build_dashboard_courses(instructor_name)
+        if 'error' in dashboard:
+            return dashboard
+        return self.complete_dashboard(dashboard, self.get_at_risk_students(instructor_name=instructor_name))
+    
+    def build_dashboard_courses(self, instructor_name):
+        """
+        The part of an instructor dashboard that depends on the dataset alone:
+        course metrics and ratings, without at-risk students or insights
+        """
         # Filter courses taught by this instructor
-        instructor_courses = self.enrollments[self.enrollments['instructor'] == instructor_name]
+        instructor_courses = self._rows('enrollments', 'instructor', instructor_name)
         
         if instructor_courses.empty:
             return {'error': 'No courses found for this instructor'}
@@ -515,16 +1174,140 @@ class PerformanceAnalytics:
             except:
                 print('Some error')
         
-        # Get at-risk students across all courses
-        at_risk_students = self.get_at_risk_students(instructor_name=instructor_name)
+        return dashboard
+    
+    def complete_dashboard(self, courses_part, at_risk_students):
+        """Add at-risk students and insights to the course part of a dashboard, as a new dict"""
+        dashboard = dict(courses_part)
         dashboard['at_risk_students_count'] = len(at_risk_students)
         dashboard['at_risk_students'] = at_risk_students
         
         # Generate insights
         dashboard['insights'] = self.generate_instructor_insights(dashboard)
-
         return dashboard
     
+    def results_version(self):
+        """Identify the data behind computed results: dataset, ingested events and risk model"""
+        model_trained_at = self.at_risk_model.get('trained_at') if self.at_risk_model else None
+        return (self.dataset_version, self.activity_version, model_trained_at)
+    
+    def get_cached_instructor_dashboard(self, instructor_name):
+        """
+        Return an instructor's dashboard from the dashboard cache, building it on a miss
+        The course part is reused for as long as the dataset is unchanged, so ingested
+        events or a new risk model only recompute the at-risk students.
+        The returned dict is shared and should not be modified by callers.
+        """
+        cache_key = (self.results_version(), instructor_name)
+        dashboard = self.dashboard_cache.get(cache_key)
+        if dashboard is None:
+            courses_part = self.get_dashboard_courses(instructor_name)
+            if 'error' in courses_part:
+                dashboard = courses_part
+            else:
+                dashboard = self.complete_dashboard(courses_part, self.get_at_risk_students(instructor_name=instructor_name))
+            self.dashboard_cache.set(cache_key, dashboard)
+        return dashboard
+    
+    def get_dashboard_courses(self, instructor_name):
+        """Course part of an instructor's dashboard: cached, then the dashboard store, then built"""
+        cache_key = (self.dataset_version, instructor_name)
+        courses_part = self.dashboard_course_cache.get(cache_key)
+        if courses_part is None and self.load_dashboard_store():
+            courses_part = self.dashboard_course_cache.get(cache_key)
+        if courses_part is None:
+            courses_part = self.build_dashboard_courses(instructor_name)
+            self.dashboard_course_cache.set(cache_key, courses_part)
+        return courses_part
+    
+    def load_dashboard_store(self):
+        """
+        Load the dashboard store into the course cache if it was written since the last
+        look and matches the current dataset. Returns True if anything was loaded.
+        """
+        store_path = os.path.join(self.data_path, DASHBOARD_STORE_FILE)
+        try:
+            mtime = os.stat(store_path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self.dashboard_store_mtime:
+            return False
+        self.dashboard_store_mtime = mtime
+        
+        try:
+            store = joblib.load(store_path)
+        except Exception as e:
+            print(f"Error loading dashboard store: {e}")
+            return False
+        if store.get('dataset_version') != self.dataset_version:
+            return False
+        for instructor_name, courses_part in store['dashboards'].items():
+            self.dashboard_course_cache.set((self.dataset_version, instructor_name), courses_part)
+        return True
+    
+    def save_dashboard_store(self, dashboards):
+        """Write the course parts of dashboards to the dashboard store, replacing it atomically"""
+        if not os.path.isdir(self.data_path):
+            return
+        store_path = os.path.join(self.data_path, DASHBOARD_STORE_FILE)
+        tmp_path = f'{store_path}.tmp{os.getpid()}'
+        try:
+            joblib.dump({'dataset_version': self.dataset_version, 'dashboards': dashboards}, tmp_path)
+            os.replace(tmp_path, store_path)
+            # Already in the cache, so this process need not read it back
+            self.dashboard_store_mtime = os.stat(store_path).st_mtime_ns
+        except Exception as e:
+            print(f"Could not write dashboard store {store_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def precompute_instructor_dashboards(self, max_workers=0):
+        """
+        Build the course part of every instructor's dashboard for the current dataset,
+        skipping ones already cached or in the dashboard store, and save them all to
+        the store, from which this and other processes serve them.
+        With max_workers > 0 a pool of spawned worker processes builds them, each loading
+        the dataset from disk. Spawned workers re-import the main module, so only use it
+        from a script that is safe to import, like the command line below; never from the
+        web app. Parts a worker built from another dataset are rebuilt here.
+        Returns the number of dashboards stored.
+        """
+        version = self.dataset_version
+        instructors = [str(name) for name in self.courses['instructor'].dropna().unique()]
+        start_time = time.perf_counter()
+        
+        self.load_dashboard_store()
+        dashboards = {}
+        for instructor_name in instructors:
+            courses_part = self.dashboard_course_cache.get((version, instructor_name))
+            if courses_part is not None:
+                dashboards[instructor_name] = courses_part
+        pending = [name for name in instructors if name not in dashboards]
+        
+        if max_workers and pending:
+            workers = min(max_workers, len(pending))
+            try:
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_init_dashboard_worker,
+                                         initargs=(self.data_path, self.interaction_retention_days)) as pool:
+                    for worker_version, built in pool.map(_build_dashboards_in_worker, [pending[i::workers] for i in range(workers)]):
+                        if worker_version == version:
+                            dashboards.update(built)
+            except Exception as e:
+                print(f"Dashboard workers failed, building dashboards in process: {e}")
+        
+        for instructor_name in instructors:
+            if instructor_name not in dashboards:
+                dashboards[instructor_name] = self.build_dashboard_courses(instructor_name)
+            self.dashboard_course_cache.set((version, instructor_name), dashboards[instructor_name])
+        
+        if pending:
+            self.save_dashboard_store(dashboards)
+        self.dashboards_version = version
+        print(f"Precomputed {len(pending)} of {len(instructors)} instructor dashboards in {time.perf_counter() - start_time:.2f}s")
+        return len(instructors)
+    
     def get_at_risk_students(self, course_code=None, instructor_name=None):
         """
         Get a list of at-risk students for a course or instructor
@@ -532,21 +1315,33 @@ class PerformanceAnalytics:
         """
         # Define which students to analyze
         if course_code:
-            student_enrollments = self.enrollments[self.enrollments['course_code'] == course_code]
+            student_enrollments = self._rows('enrollments', 'course_code', course_code)
             student_ids = student_enrollments['student_id'].unique()
         elif instructor_name:
-            instructor_courses = self.enrollments[self.enrollments['instructor'] == instructor_name]
+            instructor_courses = self._rows('enrollments', 'instructor', instructor_name)
             student_ids = instructor_courses['student_id'].unique()
         else:
             # If neither specified, analyze all students
             student_ids = self.students['student_id'].unique()
         
+        # Score every student in scope in one pass instead of calling
+        # get_student_performance once per student
+        risk_frame = self.get_student_risk_frame(student_ids)
+        
+        # One model call for the whole scope; rows it cannot score use the rules
+        model_scores = self.predict_model_risk(risk_frame)
+        
         at_risk_students = []
         
-        # Assess each student
-        for student_id in student_ids:
-            student_metrics = self.get_student_performance(student_id)
-            risk_score = student_metrics.get('risk_score', 0)
+        for student_id, student_metrics in zip(risk_frame.index, risk_frame.to_dict('records')):
+            # Students with no interactions at all keep the default activity level
+            if pd.isna(student_metrics['recent_activity_count']):
+                del student_metrics['recent_activity_count']
+            student_metrics['insights'] = [FALLING_BEHIND_INSIGHT] if student_metrics.pop('falling_behind') else []
+            if model_scores is not None and pd.notna(model_scores[student_id]):
+                risk_score = float(model_scores[student_id])
+            else:
+                risk_score = self.predict_student_risk(student_metrics)
             
             # Only include students with moderate to high risk
             if risk_score > 0.4:  # Threshold for "at risk"
@@ -565,6 +1360,55 @@ class PerformanceAnalytics:
         
         return at_risk_students
     
+    def get_student_risk_frame(self, student_ids):
+        """
+        Compute the risk inputs for many students at once
+        Returns a DataFrame indexed by student_id (in the given order) with the same
+        attendance, GPA and activity figures get_student_performance reports, plus
+        the risk model features. Students without enrollments or performance data are left out, just as
+        get_student_performance returns no risk score for them.
+        """
+        student_ids = pd.Index(pd.unique(np.asarray(student_ids, dtype=object)))
+        
+        students = self._rows_for_keys('students', 'student_id', student_ids)
+        students = students.drop_duplicates(subset=['student_id']).set_index('student_id')
+        enrollments = self._rows_for_keys('enrollments', 'student_id', student_ids)
+        performance = widen_scores(self._rows_for_keys('performance', 'student_id', student_ids))
+        
+        has_data = student_ids.isin(students.index) & student_ids.isin(enrollments['student_id']) & student_ids.isin(performance['student_id'])
+        scored_ids = student_ids[has_data]
+        
+        frame = students.reindex(scored_ids)[['name', 'current_trimester', 'cgpa']]
+        
+        # Attendance is averaged over every performance record of the student
+        frame['avg_attendance'] = performance.groupby('student_id', observed=True)['attendance_percentage'].mean().reindex(scored_ids)
+        
+        # Each enrollment with the first performance record for its course
+        student_courses = self._rows_for_keys('student_courses', 'student_id', student_ids)
+        
+        # GPA over completed courses (all courses are 4 credits, so it is a plain mean);
+        # a missing grade point makes the GPA undefined, as in get_student_performance
+        completed = student_courses[student_courses['status'] != 'Ongoing']
+        completed_by_student = completed.groupby('student_id', observed=True)['grade_point']
+        gpa = completed_by_student.mean().where(~completed['grade_point'].isna().groupby(completed['student_id'], observed=True).any())
+        frame['calculated_gpa'] = gpa.reindex(scored_ids).where(scored_ids.isin(gpa.index), 0)
+        
+        # Falling behind when fewer than half of the ongoing courses have a quiz1 score
+        ongoing = student_courses[student_courses['status'] == 'Ongoing']
+        quiz1_ratio = ongoing['quiz1'].notna().groupby(ongoing['student_id'], observed=True).mean()
+        frame['falling_behind'] = (quiz1_ratio < 0.5).reindex(scored_ids, fill_value=False).astype(bool)
+        
+        # Activity in the last 30 days, left empty for students with no interactions at all
+        frame['recent_activity_count'] = self.count_recent_activity().reindex(scored_ids)
+        
+        # Risk model features, averaged over the student's records that have them
+        record_features = self.build_risk_features(performance).dropna(subset=['quiz1', 'attendance_percentage'])
+        student_features = record_features.groupby(performance['student_id'], observed=True).mean()
+        frame = frame.join(student_features.reindex(scored_ids))
+        
+        frame.index.name = 'student_id'
+        return frame
+    
     def get_risk_factors(self, student_metrics):
         """Extract the key factors contributing to a student's risk score"""
         factors = []
@@ -624,4 +1468,341 @@ class PerformanceAnalytics:
         else:
             insights.extend(course_insights)
         
-        return insights
\ No newline at end of file
+        return insights
+
+
+# Process-wide instance shared by the insight routes
+_shared_analytics = None
+_shared_analytics_lock = threading.Lock()
+
+# Background reload bookkeeping
+_reload_lock = threading.Lock()
+_reload_thread = None
+_last_reload_check = 0.0
+
+# Background dashboard precompute bookkeeping, and the instance a dashboard
+# worker process builds from
+_precompute_lock = threading.Lock()
+_precompute_thread = None
+_worker_analytics = None
+
+
+def get_analytics():
+    """
+    Return the shared PerformanceAnalytics instance, loading the data on first use
+    Changed data files are picked up by a background reload; until it finishes
+    the current instance keeps serving requests
+    """
+    global _shared_analytics
+    if _shared_analytics is None:
+        with _shared_analytics_lock:
+            if _shared_analytics is None:
+                _shared_analytics = PerformanceAnalytics(data_path=DEFAULT_DATA_PATH)
+    else:
+        check_for_data_changes()
+    return _shared_analytics
+
+
+def check_for_data_changes():
+    """Start a background reload if the data files changed since the shared instance loaded them"""
+    global _last_reload_check
+    now = time.monotonic()
+    if now - _last_reload_check < RELOAD_CHECK_INTERVAL:
+        return
+    _last_reload_check = now
+    
+    analytics = _shared_analytics
+    if analytics is None:
+        return
+    if dataset_signature(analytics.data_path) != analytics.dataset_signature:
+        request_analytics_reload()
+    else:
+        # A model trained and saved by another worker
+        analytics.refresh_risk_model()
+
+
+def request_analytics_reload():
+    """Reload the shared instance in a background thread, unless a reload is already running"""
+    global _reload_thread
+    with _reload_lock:
+        if _reload_thread is None or not _reload_thread.is_alive():
+            _reload_thread = threading.Thread(target=_reload_when_settled, daemon=True)
+            _reload_thread.start()
+        return _reload_thread
+
+
+def _reload_when_settled():
+    """Wait until the data files stop changing, then reload the shared instance"""
+    signature = dataset_signature(DEFAULT_DATA_PATH)
+    while True:
+        time.sleep(RELOAD_SETTLE_SECONDS)
+        current = dataset_signature(DEFAULT_DATA_PATH)
+        if current == signature:
+            break
+        signature = current
+    reload_analytics()
+
+
+def reload_analytics():
+    """
+    Reload the shared instance from disk
+    A fresh instance is built and swapped in, so callers still holding the old
+    one finish their work on the data they started with. If the new data cannot
+    be loaded, the old instance stays in place. Events added with
+    ingest_interactions are not in the files and are carried over.
+    """
+    global _shared_analytics
+    analytics = PerformanceAnalytics(data_path=DEFAULT_DATA_PATH)
+    with _shared_analytics_lock:
+        previous = _shared_analytics
+        if analytics.load_error and previous is not None:
+            print(f"Keeping previous analytics data: {analytics.load_error}")
+            return previous
+        if previous is not None and analytics.at_risk_model is None:
+            analytics.at_risk_model = previous.at_risk_model
+        if previous is not None:
+            # Held until the swap so no event is ingested into the old instance meanwhile
+            with previous._ingest_lock:
+                ingested = previous.ingested_interactions()
+                if len(ingested):
+                    analytics.ingest_interactions(ingested)
+                _shared_analytics = analytics
+        else:
+            _shared_analytics = analytics
+    return analytics
+
+
+def request_dashboard_precompute():
+    """
+    Precompute every instructor dashboard of the shared instance in a background
+    thread, unless they are already built for its current dataset or a run is going.
+    They are built in this process, so no extra copy of the dataset is loaded.
+    """
+    global _precompute_thread
+    analytics = _shared_analytics
+    if analytics is None or analytics.dashboards_version == analytics.dataset_version:
+        return None
+    with _precompute_lock:
+        if _precompute_thread is None or not _precompute_thread.is_alive():
+            _precompute_thread = threading.Thread(target=analytics.precompute_instructor_dashboards, daemon=True)
+            _precompute_thread.start()
+        return _precompute_thread
+
+
+def _init_dashboard_worker(data_path, retention_days):
+    """Load the dataset once in a dashboard worker process"""
+    global _worker_analytics
+    _worker_analytics = PerformanceAnalytics(data_path=data_path, interaction_retention_days=retention_days)
+
+
+def _build_dashboards_in_worker(instructors):
+    """Build the course part of dashboards in a worker process, tagged with the dataset version"""
+    analytics = _worker_analytics
+    dashboards = {name: analytics.build_dashboard_courses(name) for name in instructors}
+    return analytics.dataset_version, dashboards
+
+
+def dataset_signature(data_path):
+    """Size and modification time of every data file, used to notice changes on disk"""
+    signature = []
+    for name in DATASET_TABLES:
+        for path in table_files(data_path, name):
+            try:
+                stat = os.stat(path)
+                signature.append((name, os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                signature.append((name, os.path.basename(path), None, None))
+    return tuple(signature)
+
+
+def table_files(data_path, name):
+    """
+    CSV files holding a table, in order: the part files of <name>/ when the
+    table is partitioned, otherwise <name>.csv
+    """
+    parts = sorted(glob.glob(os.path.join(data_path, name, PARTITION_PATTERN)))
+    return parts or [os.path.join(data_path, f'{name}.csv')]
+
+
+def read_table(data_path, name):
+    """
+    Read one table of the analytics dataset, from <name>.csv or its part files
+    Uses the Feather copy <name>.feather when it was built from exactly these CSVs;
+    otherwise parses the CSVs and writes the Feather copy for the next load.
+    The interaction log is read whole by read_interactions; call that directly
+    to apply a retention window.
+    """
+    if name == 'interactions':
+        return read_interactions(data_path)
+    
+    csv_files = table_files(data_path, name)
+    feather_path = os.path.join(data_path, f'{name}.feather')
+    
+    # Taken before parsing, so a file replaced meanwhile does not match the copy
+    sources = source_signature(csv_files)
+    frame = read_feather_cache(sources, feather_path)
+    if frame is not None:
+        return apply_schema(frame, name)
+    
+    if len(csv_files) == 1:
+        frame = pd.read_csv(csv_files[0])
+    else:
+        frame = pd.concat([pd.read_csv(path) for path in csv_files], ignore_index=True)
+    
+    # Parse datetime columns once, so the Feather copy stores them typed
+    for column in DATETIME_COLUMNS.get(name, []):
+        if column in frame.columns:
+            frame[column] = pd.to_datetime(frame[column])
+    frame = apply_schema(frame, name)
+    
+    if sources is not None:
+        write_feather_cache(frame, feather_path, sources)
+    
+    return frame
+
+
+def read_interactions(data_path, retention_days=None):
+    """
+    Read the interaction log in chunks, so only one chunk of raw text is parsed
+    at a time. Keeps INTERACTION_COLUMNS, stores ids and types as categoricals
+    and drops events older than retention_days. The whole log is cached as
+    Feather; a trimmed log is not, so it is always read from the CSV.
+    """
+    csv_files = table_files(data_path, 'interactions')
+    feather_path = os.path.join(data_path, 'interactions.feather')
+    sources = source_signature(csv_files)
+    
+    if retention_days is None:
+        frame = read_feather_cache(sources, feather_path)
+        # Copies written before the log was trimmed to INTERACTION_COLUMNS are replaced
+        if frame is not None and list(frame.columns) == INTERACTION_COLUMNS:
+            return frame
+        cutoff = None
+    else:
+        cutoff = pd.Timestamp(datetime.now()) - pd.Timedelta(days=retention_days)
+    
+    chunks = []
+    for csv_path in csv_files:
+        for chunk in pd.read_csv(csv_path, usecols=INTERACTION_COLUMNS, chunksize=INTERACTION_CHUNK_ROWS):
+            chunk['timestamp'] = pd.to_datetime(chunk['timestamp'])
+            if cutoff is not None:
+                chunk = chunk[chunk['timestamp'] >= cutoff]
+            chunks.append(compact_interactions(chunk))
+    frame = concat_interactions(chunks)
+    
+    if sources is not None and retention_days is None:
+        write_feather_cache(frame, feather_path, sources)
+    
+    return frame
+
+
+def compact_interactions(events):
+    """Interaction events in the in-memory layout: categorical ids and float32 durations"""
+    events = events.reindex(columns=INTERACTION_COLUMNS)
+    events['duration_minutes'] = pd.to_numeric(events['duration_minutes'])
+    return apply_schema(events, 'interactions')
+
+
+def apply_schema(frame, name):
+    """Convert a table's columns to the compact types in TABLE_SCHEMAS"""
+    for column, dtype in TABLE_SCHEMAS.get(name, {}).items():
+        if column not in frame.columns or frame[column].dtype == dtype:
+            continue
+        if dtype == 'category':
+            # Through str first, so the categories of every block share one dtype;
+            # missing values stay missing rather than becoming a 'nan' category
+            values = frame[column]
+            frame[column] = values.astype('str').where(values.notna()).astype('category')
+        elif dtype.startswith('int'):
+            if frame[column].notna().all():
+                frame[column] = frame[column].astype(dtype)
+        else:
+            frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+def widen_scores(frame):
+    """
+    Return frame with its float32 columns as float64, rounded to SCORE_DECIMALS,
+    for figures that are averaged or handed out in API responses
+    """
+    columns = frame.select_dtypes('float32').columns
+    if columns.empty:
+        return frame
+    return frame.assign(**{column: frame[column].astype('float64').round(SCORE_DECIMALS) for column in columns})
+
+
+def concat_interactions(chunks):
+    """
+    Concatenate blocks of compact interaction events
+    Categorical columns are merged with union_categoricals, since a plain concat
+    of differing categories would fall back to full string columns.
+    """
+    chunks = [chunk for chunk in chunks if len(chunk)] or chunks[:1]
+    if not chunks:
+        return compact_interactions(pd.DataFrame(columns=INTERACTION_COLUMNS))
+    
+    frame = pd.concat([chunk.drop(columns=INTERACTION_CATEGORIES) for chunk in chunks], ignore_index=True)
+    for column in INTERACTION_CATEGORIES:
+        frame[column] = union_categoricals([chunk[column] for chunk in chunks], ignore_order=True)
+    return frame[INTERACTION_COLUMNS]
+
+
+def source_signature(csv_files):
+    """
+    Name, size and modification time (ns) of each CSV file of a table, as the
+    string stored with its Feather copy; None if a file is missing
+    """
+    signature = []
+    for path in csv_files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return json.dumps(signature)
+
+
+def read_feather_cache(sources, feather_path):
+    """
+    Return a table's Feather copy if it was built from CSV files with exactly this
+    source_signature, else None. An exact match rather than a newer-than check,
+    so a CSV replaced by an older file (a restored backup, cp -p) is still noticed.
+    """
+    if feather is None or sources is None or not os.path.exists(feather_path):
+        return None
+    try:
+        table = feather.read_table(feather_path, memory_map=True)
+        if (table.schema.metadata or {}).get(FEATHER_SOURCE_KEY) != sources.encode():
+            return None
+        return table.to_pandas()
+    except Exception as e:
+        print(f"Error reading {feather_path}, falling back to CSV: {e}")
+        return None
+
+
+def write_feather_cache(frame, feather_path, sources):
+    """Write a table's Feather copy atomically, stamped with its source_signature, ignoring failures"""
+    tmp_path = f'{feather_path}.tmp{os.getpid()}'
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), FEATHER_SOURCE_KEY: sources.encode()})
+        # Uncompressed so the file can be memory-mapped on read
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, feather_path)
+    except Exception as e:
+        print(f"Could not write {feather_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Precompute every instructor dashboard into the dashboard store the API serves from')
+    parser.add_argument('--data-path', default=DEFAULT_DATA_PATH, help='directory holding the dataset')
+    parser.add_argument('--workers', type=int, default=DASHBOARD_WORKERS,
+                        help='worker processes building the dashboards (0 builds them in this process)')
+    args = parser.parse_args()
+    
+    PerformanceAnalytics(data_path=args.data_path).precompute_instructor_dashboards(max_workers=args.workers)
@@ -1,11 +1,146 @@
 import os
 import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+try:
+    from .data_analysis import LRUCache
+except ImportError:
+    # Imported as a top-level module by the API routes
+    from data_analysis import LRUCache
+
+# Gemini model used for every narrative
+NARRATIVE_MODEL = 'gemini-2.0-flash'
+
+# Text returned when the model gives no narrative; it is never cached
+NARRATIVE_FALLBACK = "Unable to generate narrative at this time."
+
+# Generated narratives kept per cache, and how long (seconds) one is reused
+NARRATIVE_CACHE_SIZE = 512
+NARRATIVE_CACHE_TTL = 24 * 3600
+
+# Threads generating narratives in the background, and how many narrative jobs are remembered
+NARRATIVE_WORKERS = 2
+MAX_TRACKED_NARRATIVES = 200
+
+# File the API routes persist their narrative cache to
+NARRATIVE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'narrative_cache.json')
+
+
+class NarrativeCache(LRUCache):
+    """
+    Content-addressed cache of generated narratives
+    Entries are keyed by a digest of the model and prompt, expire after ttl seconds
+    and are evicted least-recently-used first; with a path they are kept on disk
+    """
+    
+    def __init__(self, maxsize=NARRATIVE_CACHE_SIZE, ttl=NARRATIVE_CACHE_TTL, path=None):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.path = path
+        with self._lock:
+            self._entries.update(self._load())
+    
+    @staticmethod
+    def make_key(model_name, prompt):
+        """Return the digest a prompt is cached under"""
+        digest = hashlib.sha256()
+        digest.update(model_name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(prompt.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _now(self):
+        # Wall-clock expiry so persisted entries stay valid across restarts
+        return time.time()
+    
+    def set(self, key, text):
+        """Store a narrative, evicting the least recently used entry when full, and persist it"""
+        super().set(key, text)
+        with self._lock:
+            # Keep narratives other processes sharing the file wrote since we loaded it
+            stored = self._load()
+            merged = OrderedDict((k, entry) for k, entry in stored.items() if k not in self._entries)
+            merged.update(self._entries)
+            while len(merged) > self.maxsize:
+                merged.popitem(last=False)
+            self._entries = merged
+            self._save()
+    
+    def clear(self):
+        """Drop every entry, including the persisted ones"""
+        with self._lock:
+            self._entries.clear()
+            self._save()
+    
+    def _load(self):
+        """
+        Return the unexpired persisted entries, oldest first
+        A missing or corrupt file gives none.
+        """
+        entries = OrderedDict()
+        if not self.path or not os.path.exists(self.path):
+            return entries
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable narrative cache {self.path}: {e}")
+            return entries
+        
+        now = self._now()
+        # The file is written oldest first, so the LRU order survives a restart
+        for key, expires_at, text in stored.get('entries', [])[-self.maxsize:]:
+            if expires_at is None or expires_at > now:
+                entries[key] = (expires_at, text)
+        return entries
+    
+    def _save(self):
+        """Write the entries to disk; the caller holds the lock"""
+        if not self.path:
+            return
+        entries = [[key, expires_at, text] for key, (expires_at, text) in self._entries.items()]
+        tmp_path = f"{self.path}.tmp{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'entries': entries}, f)
+            # Replace in one step so a reader never sees a half-written file
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not persist narrative cache to {self.path}: {e}")
+
+
+# Caches shared by every generator persisting to the same file
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_narrative_cache(path=None, maxsize=NARRATIVE_CACHE_SIZE, ttl=NARRATIVE_CACHE_TTL):
+    """
+    Return the narrative cache for a file, creating it on first use
+    Without a path every call gets its own in-memory cache
+    """
+    if path is None:
+        return NarrativeCache(maxsize=maxsize, ttl=ttl)
+    
+    path = os.path.abspath(path)
+    with _shared_caches_lock:
+        if path not in _shared_caches:
+            _shared_caches[path] = NarrativeCache(maxsize=maxsize, ttl=ttl, path=path)
+        return _shared_caches[path]
+
+
 class NarrativeGenerator:
-    def __init__(self):
-        """Initialize the LLM integration for narrative generation"""
+    def __init__(self, cache_path=None, cache_size=NARRATIVE_CACHE_SIZE, cache_ttl=NARRATIVE_CACHE_TTL):
+        """
+        Initialize the LLM integration for narrative generation
+        Narratives are cached by prompt; pass cache_path to keep them on disk
+        """
         # Load environment variables
         load_dotenv()
         
@@ -15,13 +150,100 @@ class NarrativeGenerator:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
         
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.model_name = NARRATIVE_MODEL
+        self.model = genai.GenerativeModel(self.model_name)
+        self.cache = get_narrative_cache(cache_path, maxsize=cache_size, ttl=cache_ttl)
+        
+        # Background narrative jobs, keyed by the same digest as the cache
+        self._executor = ThreadPoolExecutor(max_workers=NARRATIVE_WORKERS, thread_name_prefix='narrative')
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+    
+    def _generate(self, prompt, fallback):
+        """
+        Return the model's text for a prompt, reusing a cached answer for an identical prompt
+        The fallback text is returned uncached so the next request tries again
+        """
+        key = self.cache.make_key(self.model_name, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        response = self.model.generate_content(prompt)
+        
+        # Extract and return the generated text
+        if hasattr(response, 'text'):
+            self.cache.set(key, response.text)
+            return response.text
+        else:
+            return fallback
+    
+    def _submit(self, kind, prompt, fallback):
+        """
+        Start generating a narrative in the background and return its job status
+        A cached narrative is returned as ready, and a prompt already in flight is not resubmitted
+        """
+        key = self.cache.make_key(self.model_name, prompt)
+        cached = self.cache.get(key)
+        
+        with self._jobs_lock:
+            job = self._jobs.get(key)
+            if cached is not None:
+                job = {'key': key, 'kind': kind, 'status': 'ready', 'narrative': cached, 'error': None}
+                self._jobs[key] = job
+            elif job is None or job['status'] != 'pending':
+                job = {'key': key, 'kind': kind, 'status': 'pending', 'narrative': None, 'error': None}
+                self._jobs[key] = job
+                self._executor.submit(self._run_job, key, prompt, fallback)
+            self._jobs.move_to_end(key)
+            
+            # Forget the oldest finished jobs; their narratives stay in the cache
+            while len(self._jobs) > MAX_TRACKED_NARRATIVES:
+                oldest = next((k for k, j in self._jobs.items() if j['status'] != 'pending'), None)
+                if oldest is None:
+                    break
+                del self._jobs[oldest]
+            return dict(job)
+    
+    def _run_job(self, key, prompt, fallback):
+        """Generate one narrative on the executor and record the outcome"""
+        try:
+            narrative = self._generate(prompt, fallback)
+            update = {'status': 'ready', 'narrative': narrative}
+        except Exception as e:
+            print(f"Narrative generation failed: {e}")
+            update = {'status': 'failed', 'error': str(e)}
+        
+        with self._jobs_lock:
+            if key in self._jobs:
+                self._jobs[key].update(update)
+    
+    def get_narrative_job(self, key, kind):
+        """Return the status of a narrative job, or None if this generator is not tracking it"""
+        with self._jobs_lock:
+            job = self._jobs.get(key)
+            if job is None or job['kind'] != kind:
+                return None
+            return dict(job)
+    
+    def submit_instructor_narrative(self, dashboard_data):
+        """Generate an instructor narrative in the background; see get_narrative_job"""
+        return self._submit('instructor', self.build_instructor_prompt(dashboard_data), NARRATIVE_FALLBACK)
+    
+    def submit_student_narrative(self, student_data):
+        """Generate a student narrative in the background; see get_narrative_job"""
+        return self._submit('student', self.build_student_prompt(student_data), NARRATIVE_FALLBACK)
     
     def generate_instructor_narrative(self, dashboard_data):
         """
         Generate a narrative for an instructor dashboard
         Takes the dashboard data and returns a human-friendly narrative
         """
+        # Generate the narrative
+        return self._generate(self.build_instructor_prompt(dashboard_data), NARRATIVE_FALLBACK)
+    
+    def build_instructor_prompt(self, dashboard_data):
+        """Build the LLM prompt for an instructor dashboard"""
         # Extract the most relevant information
         instructor_name = dashboard_data.get('instructor_name', 'instructor')
         total_courses = dashboard_data.get('total_courses', 0)
@@ -68,20 +290,18 @@ class NarrativeGenerator:
         Keep it around 300-400 words.
         """
         
-        # Generate the narrative
-        response = self.model.generate_content(prompt)
-        
-        # Extract and return the generated text
-        if hasattr(response, 'text'):
-            return response.text
-        else:
-            return "Unable to generate narrative at this time."
+        return prompt
     
     def generate_student_narrative(self, student_data):
         """
         Generate a personalized narrative for a student
         Takes the student performance data and returns a human-friendly narrative
         """
+        # Generate the narrative
+        return self._generate(self.build_student_prompt(student_data), NARRATIVE_FALLBACK)
+    
+    def build_student_prompt(self, student_data):
+        """Build the LLM prompt for a student's performance data"""
         # Extract the most relevant information
         student_name = student_data.get('name', 'student')
         current_trimester = student_data.get('current_trimester', 'current')
@@ -128,14 +348,7 @@ class NarrativeGenerator:
         Keep it around 250-300 words.
         """
         
-        # Generate the narrative
-        response = self.model.generate_content(prompt)
-        
-        # Extract and return the generated text
-        if hasattr(response, 'text'):
-            return response.text
-        else:
-            return "Unable to generate narrative at this time."
+        return prompt
     
     def generate_course_recommendation(self, student_data):
         """
@@ -195,13 +408,7 @@ class NarrativeGenerator:
         """
         
         # Generate the recommendations
-        response = self.model.generate_content(prompt)
-        
-        # Extract and return the generated text
-        if hasattr(response, 'text'):
-            return response.text
-        else:
-            return "Unable to generate course recommendations at this time."
+        return self._generate(prompt, "Unable to generate course recommendations at this time.")
 
 
 def test_narrative_generator():
@@ -0,0 +1,23 @@
+from flask_restful import Resource
+from flask_security import auth_required, current_user
+
+from data_analysis import get_analytics
+
+class AnalyticsCacheStatsAPI(Resource):
+    @auth_required('token')
+    def get(self):
+        """
+        Get size and hit/miss statistics of the analytics result caches
+        Endpoint: /api/admin/analytics-cache
+        Method: GET
+        """
+        # Check if user is an admin
+        if not current_user.has_role('admin'):
+            return {'message': 'Access denied. Admin role required.'}, 403
+        
+        try:
+            analytics = get_analytics()
+            return analytics.cache_stats(), 200
+        
+        except Exception as e:
+            return {'message': f'Error retrieving cache statistics: {str(e)}'}, 500
@@ -1,59 +1,144 @@
-from flask import request, jsonify
+from flask import request
 from flask_restful import Resource
 from flask_security import auth_required, current_user
-import json
-import os
-import sys
-import importlib.util
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import synthetic_data_generator as data_generator
+from data_analysis import DEFAULT_DATA_PATH, request_analytics_reload
+
+# Generation jobs run one at a time in the background, and a new one is refused
+# while another is queued or running; the most recent MAX_TRACKED_JOBS are kept
+# for the status endpoint
+MAX_TRACKED_JOBS = 50
+MAX_STUDENTS = 1000000
+
+_job_executor = ThreadPoolExecutor(max_workers=1)
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _update_job(job_id, **fields):
+    """Update a job's status record"""
+    with _jobs_lock:
+        _jobs[job_id].update(fields)
+
+
+def _job_status(job_id):
+    """Return a copy of a job's status record, with its rate and elapsed time, or None"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        job = dict(job)
+    
+    started_at = job.pop('_started')
+    finished_at = job.pop('_finished')
+    if started_at is not None:
+        elapsed = (finished_at or time.monotonic()) - started_at
+        rows = sum(job['stats'].values())
+        job['elapsed_seconds'] = round(elapsed, 2)
+        job['rows_per_second'] = round(rows / elapsed, 1) if elapsed > 0 else None
+    job['progress'] = round(job['students_done'] / job['num_students'] * 100, 1)
+    return job
+
+
+def _run_generation_job(job_id, num_students, seed):
+    """Generate the dataset for a job, recording its progress, then reload the analytics"""
+    _update_job(job_id, status='running', stage='generating', _started=time.monotonic())
+    
+    def report(stage, students_done, stats):
+        _update_job(job_id, stage=stage, students_done=students_done, stats=dict(stats))
+    
+    try:
+        stats = data_generator.save_data_to_csv(DEFAULT_DATA_PATH, num_students=num_students, seed=seed, progress=report)
+        
+        # Swap the new data into the insight endpoints without a restart
+        _update_job(job_id, stage='reloading', stats=stats)
+        request_analytics_reload()
+        
+        _update_job(job_id, status='completed', stage='completed', _finished=time.monotonic())
+    except Exception as e:
+        _update_job(job_id, status='failed', error=str(e), _finished=time.monotonic())
+
 
 class GenerateSyntheticDataAPI(Resource):
     @auth_required('token')
     def post(self):
         """
-        Generate synthetic data for demo purposes
+        Start generating synthetic data for demo purposes
         Endpoint: /api/admin/generate-data
         Method: POST
+        Returns a job id at once; progress is reported by /api/admin/generate-data/<job_id>
         """
         # Check if user is an admin
         if not current_user.has_role('admin'):
             return {'message': 'Access denied. Admin role required.'}, 403
         
-        try:
-            # Get parameters from request
-            data = request.get_json() or {}
-            num_students = data.get('num_students', 150)
-            
-            # Import the data generation module
-            spec = importlib.util.spec_from_file_location(
-                "synthetic_data_generator", 
-                os.path.join(os.path.dirname(__file__), '..', '..', 'synthetic_data_generator.py')
-            )
-            data_generator = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(data_generator)
-            
-            # Create data directory if it doesn't exist
-            data_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
-            if not os.path.exists(data_dir):
-                os.makedirs(data_dir)
+        # Get parameters from request
+        data = request.get_json(silent=True) or {}
+        num_students = data.get('num_students', 150)
+        seed = data.get('seed')
+        
+        if not isinstance(num_students, int) or isinstance(num_students, bool) or not 1 <= num_students <= MAX_STUDENTS:
+            return {'message': f'num_students must be a whole number from 1 to {MAX_STUDENTS}'}, 400
+        if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+            return {'message': 'seed must be a non-negative whole number'}, 400
+        
+        job_id = uuid.uuid4().hex
+        with _jobs_lock:
+            active = next((job for job in _jobs.values() if job['status'] in ('queued', 'running')), None)
+            if active is not None:
+                return {
+                    'message': 'A data generation job is already in progress',
+                    'job_id': active['job_id'],
+                    'status_url': f"/api/admin/generate-data/{active['job_id']}"
+                }, 409
             
-            # Generate data
-            students, enrollments, performance, interactions, feedback, courses = data_generator.save_data_to_csv()
+            _jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'stage': 'queued',
+                'num_students': num_students,
+                'students_done': 0,
+                'stats': {},
+                'error': None,
+                '_started': None,
+                '_finished': None
+            }
             
-            return {
-                'message': 'Synthetic data generated successfully',
-                'stats': {
-                    'students': len(students),
-                    'enrollments': len(enrollments),
-                    'performance_records': len(performance),
-                    'interactions': len(interactions),
-                    'feedback': len(feedback),
-                    'courses': len(courses)
-                }
-            }, 200
+            # Forget the oldest finished jobs; the one just queued is never dropped
+            while len(_jobs) > MAX_TRACKED_JOBS:
+                oldest = next(key for key, job in _jobs.items() if job['status'] in ('completed', 'failed'))
+                del _jobs[oldest]
             
-        except Exception as e:
-            import traceback
-            return {
-                'message': f'Error generating synthetic data: {str(e)}',
-                'traceback': traceback.format_exc()
-            }, 500
\ No newline at end of file
+            # Submitted under the lock, so no second job can be queued in between
+            _job_executor.submit(_run_generation_job, job_id, num_students, seed)
+        
+        return {
+            'message': 'Synthetic data generation started',
+            'job_id': job_id,
+            'status_url': f'/api/admin/generate-data/{job_id}'
+        }, 202
+
+
+class GenerateSyntheticDataStatusAPI(Resource):
+    @auth_required('token')
+    def get(self, job_id):
+        """
+        Get the progress of a synthetic data generation job
+        Endpoint: /api/admin/generate-data/<job_id>
+        Method: GET
+        """
+        # Check if user is an admin
+        if not current_user.has_role('admin'):
+            return {'message': 'Access denied. Admin role required.'}, 403
+        
+        job = _job_status(job_id)
+        if job is None:
+            return {'message': f'Generation job {job_id} not found'}, 404
+        
+        return job, 200
@@ -2,23 +2,16 @@ from flask import request, jsonify
 from flask_restful import Resource
 from flask_security import auth_required, current_user, roles_required
 import json
-import os
 from dotenv import load_dotenv
 
 # Import the analytics and narrative generator
-from data_analysis import PerformanceAnalytics
-from llm_integration import NarrativeGenerator
+from data_analysis import get_analytics, request_dashboard_precompute
+from llm_integration import NarrativeGenerator, NARRATIVE_CACHE_PATH
 
 # Load environment variables for API keys
 load_dotenv()
 
-# Get the current file's directory
-current_dir = os.path.dirname(os.path.abspath(__file__))
-
-data_path = os.path.join(current_dir, '..', '..', 'data')
-
-analytics = PerformanceAnalytics(data_path=data_path)
-narrative_generator = NarrativeGenerator()
+narrative_generator = NarrativeGenerator(cache_path=NARRATIVE_CACHE_PATH)
 
 class InstructorInsightAPI(Resource):
     @auth_required('token')
@@ -38,22 +31,54 @@ class InstructorInsightAPI(Resource):
         instructor_name = "Dr. Anil Kumar"
         
         try:
-            # Get comprehensive dashboard data
-            dashboard_data = analytics.get_instructor_dashboard_data(instructor_name)
+            analytics = get_analytics()
+            
+            # Get comprehensive dashboard data, served from the dashboard cache
+            dashboard_data = analytics.get_cached_instructor_dashboard(instructor_name)
             
-            # Generate narrative
-            narrative = narrative_generator.generate_instructor_narrative(dashboard_data)
+            # The other instructors' dashboards are built in the background after data changes
+            request_dashboard_precompute()
+            
+            # Generate the narrative in the background; the client polls for it by key
+            narrative = narrative_generator.submit_instructor_narrative(dashboard_data)
             
             # Return combined data
             return {
                 'dashboard_data': dashboard_data,
-                'narrative': narrative
+                'narrative': narrative['narrative'],
+                'narrative_status': narrative['status'],
+                'narrative_key': narrative['key']
             }, 200
             
         except Exception as e:
             return {'message': f'Error generating insights: {str(e)}'}, 500
 
 
+class InstructorNarrativeAPI(Resource):
+    @auth_required('token')
+    @roles_required('instructor')
+    def get(self, narrative_key):
+        """
+        Get the status of a narrative started by the instructor insights endpoint
+        Endpoint: /api/instructor/insights/narrative/<narrative_key>
+        Method: GET
+        """
+        # Check if user is an instructor
+        if not current_user.has_role('instructor'):
+            return {'message': 'Access denied. Instructor role required.'}, 403
+        
+        job = narrative_generator.get_narrative_job(narrative_key, 'instructor')
+        if job is None:
+            return {'message': 'Narrative not found. Reload the insights to generate it again.'}, 404
+        
+        return {
+            'narrative': job['narrative'],
+            'narrative_status': job['status'],
+            'narrative_key': job['key'],
+            'error': job['error']
+        }, 200
+
+
 class CourseInsightAPI(Resource):
     @auth_required('token')
     @roles_required('instructor')
@@ -71,6 +96,8 @@ class CourseInsightAPI(Resource):
         instructor_name = current_user.name
         
         try:
+            analytics = get_analytics()
+            
             # Map course_id to course_code (in a real app, this would be from database)
             # For this prototype, we'll use a simple mapping
             course_mapping = {
@@ -112,6 +139,8 @@ class AtRiskStudentsAPI(Resource):
         instructor_name = current_user.name
         
         try:
+            analytics = get_analytics()
+            
             # Get at-risk students for this instructor
             at_risk_students = analytics.get_at_risk_students(instructor_name=instructor_name)
             
@@ -135,12 +164,24 @@ class TrainRiskModelAPI(Resource):
         if not current_user.has_role('admin'):
             return {'message': 'Access denied. Admin role required.'}, 403
         
+        # Optional number of parallel jobs for fitting the forest; -1 uses every core
+        data = request.get_json(silent=True) or {}
+        n_jobs = data.get('n_jobs')
+        if n_jobs is not None and (not isinstance(n_jobs, int) or isinstance(n_jobs, bool) or n_jobs == 0):
+            return {'message': 'n_jobs must be a non-zero whole number or null'}, 400
+        
         try:
+            analytics = get_analytics()
+            
             # Train the risk prediction model
-            model_result = analytics.train_risk_prediction_model()
+            model_result = analytics.train_risk_prediction_model(persist=True, n_jobs=n_jobs)
             
             if model_result:
-                return {'message': f'Risk prediction model trained successfully. Accuracy: {model_result["accuracy"]:.2f}'}, 200
+                return {
+                    'message': f'Risk prediction model trained successfully. Accuracy: {model_result["accuracy"]:.2f}',
+                    'training_rows': model_result['training_rows'],
+                    'training_seconds': round(model_result['training_seconds'], 3)
+                }, 200
             else:
                 return {'message': 'Unable to train risk prediction model. Insufficient data.'}, 400
             
@@ -3,19 +3,22 @@ from flask_restful import Resource
 from flask_security import auth_required, current_user
 import json
 import numpy as np
-import os
 
 # Import the analytics and narrative generator
-from data_analysis import PerformanceAnalytics
-from llm_integration import NarrativeGenerator
+from data_analysis import get_analytics
+from llm_integration import NarrativeGenerator, NARRATIVE_CACHE_PATH
 
-# Get the current file's directory
-current_dir = os.path.dirname(os.path.abspath(__file__))
+narrative_generator = NarrativeGenerator(cache_path=NARRATIVE_CACHE_PATH)
 
-data_path = os.path.join(current_dir, '..', '..', 'data')
-
-analytics = PerformanceAnalytics(data_path=data_path)
-narrative_generator = NarrativeGenerator()
+def clean_nans(data):
+    """Replace NaN values with None, since NaN is not valid JSON"""
+    if isinstance(data, dict):
+        return {k: clean_nans(v) for k, v in data.items()}
+    elif isinstance(data, list):
+        return [clean_nans(item) for item in data]
+    elif isinstance(data, float) and np.isnan(data):
+        return None
+    return data
 
 class StudentInsightAPI(Resource):
     @auth_required('token')
@@ -33,31 +36,51 @@ class StudentInsightAPI(Resource):
         #student_id = current_user.id  # This would come from your user model
         student_id = "DS006"        
         try:
+            analytics = get_analytics()
+            
             student_data = analytics.get_student_performance(student_id)
             
             # Clean NaN values
-            def clean_nans(data):
-                if isinstance(data, dict):
-                    return {k: clean_nans(v) for k, v in data.items()}
-                elif isinstance(data, list):
-                    return [clean_nans(item) for item in data]
-                elif isinstance(data, float) and np.isnan(data):
-                    return None
-                return data
-            
             cleaned_data = clean_nans(student_data)
             
-            narrative = narrative_generator.generate_student_narrative(cleaned_data)
+            # Generate the narrative in the background; the client polls for it by key
+            narrative = narrative_generator.submit_student_narrative(cleaned_data)
             
             return {
                 'student_data': cleaned_data,
-                'narrative': narrative
+                'narrative': narrative['narrative'],
+                'narrative_status': narrative['status'],
+                'narrative_key': narrative['key']
             }, 200
             
         except Exception as e:
             return {'message': f'Error generating insights: {str(e)}'}, 500
 
 
+class StudentNarrativeAPI(Resource):
+    @auth_required('token')
+    def get(self, narrative_key):
+        """
+        Get the status of a narrative started by the student insights endpoint
+        Endpoint: /api/student/insights/narrative/<narrative_key>
+        Method: GET
+        """
+        # Check if user is a student
+        if not current_user.has_role('student'):
+            return {'message': 'Access denied. Student role required.'}, 403
+        
+        job = narrative_generator.get_narrative_job(narrative_key, 'student')
+        if job is None:
+            return {'message': 'Narrative not found. Reload the insights to generate it again.'}, 404
+        
+        return {
+            'narrative': job['narrative'],
+            'narrative_status': job['status'],
+            'narrative_key': job['key'],
+            'error': job['error']
+        }, 200
+
+
 class CourseRecommendationAPI(Resource):
     @auth_required('token')
     def get(self):
@@ -74,6 +97,8 @@ class CourseRecommendationAPI(Resource):
         student_id = current_user.id
         
         try:
+            analytics = get_analytics()
+            
             # Get performance data for the student
             student_data = analytics.get_student_performance(student_id)
             
@@ -106,6 +131,8 @@ class PerformanceComparisonAPI(Resource):
         student_id = current_user.id
         
         try:
+            analytics = get_analytics()
+            
             # Map course_id to course_code (in a real app, this would be from database)
             # For this prototype, we'll use a simple mapping
             course_mapping = {
@@ -123,9 +150,6 @@ class PerformanceComparisonAPI(Resource):
             # Get student performance data
             student_data = analytics.get_student_performance(student_id)
             
-            # Get course performance data (class averages)
-            course_data = analytics.get_course_performance(course_code=course_code)
-            
             # Extract student's performance in this course
             student_course_data = None
             for course in student_data.get('ongoing_courses', []) + student_data.get('completed_courses', []):
@@ -136,27 +160,9 @@ class PerformanceComparisonAPI(Resource):
             if not student_course_data:
                 return {'message': f'Student not enrolled in course with ID {course_id}'}, 404
             
-            # Prepare comparison data
-            comparison = {
-                'course_code': course_code,
-                'course_name': course_data.get('course_name', 'Unknown Course'),
-                'student_performance': {
-                    'quiz1': student_course_data.get('quiz1'),
-                    'quiz2': student_course_data.get('quiz2'),
-                    'endterm': student_course_data.get('endterm'),
-                    'attendance': student_course_data.get('attendance_percentage'),
-                    'total_score': student_course_data.get('total_score'),
-                    'grade': student_course_data.get('grade')
-                },
-                'class_average': {
-                    'quiz1': course_data.get('avg_quiz1'),
-                    'quiz2': course_data.get('avg_quiz2'),
-                    'endterm': course_data.get('avg_endterm'),
-                    'attendance': course_data.get('avg_attendance'),
-                    'pass_rate': course_data.get('pass_rate')
-                },
-                'percentile': calculate_percentile(student_course_data, course_data)
-            }
+            # Compare with the class averages precomputed for the course
+            # Ongoing courses have no quiz 2, endterm or grade yet
+            comparison = clean_nans(analytics.build_course_comparison(student_course_data, course_code))
             
             return comparison, 200
             
@@ -164,40 +170,30 @@ class PerformanceComparisonAPI(Resource):
             return {'message': f'Error generating comparison: {str(e)}'}, 500
 
 
-def calculate_percentile(student_data, course_data):
-    """
-    Calculate student's percentile in the course
-    This is a simplified version for the prototype
-    """
-    # This would typically be calculated using the actual distribution of scores
-    # For the prototype, we'll use a simple estimation
-    
-    student_total = student_data.get('total_score')
-    if not student_total:
-        return None
-    
-    # Simplistic approach assuming a normal distribution
-    # In a real implementation, you would use actual student rankings
-    class_avg = (
-        course_data.get('avg_quiz1', 0) * 0.15 +
-        course_data.get('avg_quiz2', 0) * 0.15 +
-        course_data.get('avg_endterm', 0) * 0.40 +
-        course_data.get('avg_assignment_score', 0) * 0.30
-    )
-    
-    # Assume standard deviation is 10% of the mean
-    std_dev = class_avg * 0.1
-    
-    # Calculate z-score
-    if std_dev == 0:
-        return 50  # Default to median if we can't calculate
-    
-    z_score = (student_total - class_avg) / std_dev
-    
-    # Convert z-score to percentile (simplified)
-    import math
-    import scipy.stats as stats
-    
-    percentile = stats.norm.cdf(z_score) * 100
-    
-    return round(percentile, 1)
\ No newline at end of file
+class PerformanceComparisonListAPI(Resource):
+    @auth_required('token')
+    def get(self):
+        """
+        Get student performance compared to class average for every enrolled course
+        Endpoint: /api/student/courses/comparison
+        Method: GET
+        """
+        # Check if user is a student
+        if not current_user.has_role('student'):
+            return {'message': 'Access denied. Student role required.'}, 403
+        
+        # Get student ID from the authenticated user
+        student_id = current_user.id
+        
+        try:
+            analytics = get_analytics()
+            
+            comparisons = analytics.get_course_comparisons(student_id)
+            if comparisons is None:
+                return {'message': 'No course data found for this student'}, 404
+            
+            # Ongoing courses have no quiz 2, endterm or grade yet
+            return {'comparisons': clean_nans(comparisons)}, 200
+            
+        except Exception as e:
+            return {'message': f'Error generating comparisons: {str(e)}'}, 500
@@ -1,7 +1,11 @@
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
+import os
+import glob
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 
 # Define course information
 DS_COURSES = {
@@ -68,9 +72,32 @@ INSTRUCTORS = {
     'Capstone Project': 'Dr. Vikram Iyer'
 }
 
-def generate_student_profiles(num_students=100):
-    """Generate synthetic student profiles"""
-    student_ids = [f"DS{str(i+1).zfill(3)}" for i in range(num_students)]
+# Letter grades by total score: the lower bound of each band above F,
+# then every grade with its grade point
+GRADE_THRESHOLDS = [50, 60, 70, 80, 90]
+GRADES = ['F', 'E', 'D', 'C', 'B', 'A']
+GRADE_POINTS = np.array([0, 6, 7, 8, 9, 10])
+
+# Students per shard in sharded generation; shards are the unit of seeding, so
+# the output depends on the shard size but not on the number of workers
+SHARD_SIZE = 50000
+
+# Students generated per batch when streaming the dataset to disk
+BATCH_SIZE = 10000
+
+# Tables written per student shard, as <table>/part-<shard>.csv
+SHARDED_TABLES = ['students', 'enrollments', 'performance', 'interactions', 'feedback']
+
+# Repeated labels are built as categoricals from integer codes, which keeps
+# generation fast and the frames small at 100k+ students
+
+def generate_student_profiles(num_students=100, rng=None, first_id=1, reference_date=None):
+    """
+    Generate synthetic student profiles
+    IDs are numbered from first_id; trimesters are worked out as of reference_date (default now)
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    student_ids = 'DS' + pd.Series(np.arange(first_id, first_id + num_students)).astype(str).str.zfill(3)
     
     # Names
     first_names = ['Aarav', 'Aditya', 'Akshay', 'Arjun', 'Arnav', 'Aryan', 'Ayush', 'Dev', 'Dhruv', 'Harsh', 
@@ -82,332 +109,253 @@ def generate_student_profiles(num_students=100):
                  'Jain', 'Kapoor', 'Khan', 'Kumar', 'Malhotra', 'Mehta', 'Nair', 'Patel', 'Rao', 'Reddy',
                  'Saxena', 'Shah', 'Sharma', 'Singh', 'Sinha', 'Trivedi', 'Verma', 'Yadav']
     
-    names = [f"{random.choice(first_names)} {random.choice(last_names)}" for _ in range(num_students)]
+    first = pd.Series(rng.choice(first_names, num_students))
+    names = first + ' ' + pd.Series(rng.choice(last_names, num_students))
+    
+    enrollment_dates = pd.Series(rng.choice(pd.date_range(start='2022-01-01', end='2024-01-01', freq='D'), num_students))
+    
+    # Current trimester follows from the enrollment date (a new trimester every 4 months),
+    # with some noise (some students might have taken breaks or failed)
+    today = reference_date or datetime.now()
+    months_diff = (today.year - enrollment_dates.dt.year) * 12 + today.month - enrollment_dates.dt.month
+    expected_trimester = np.minimum(6, months_diff.to_numpy() // 4 + 1)
+    current_trimester = np.clip(expected_trimester + rng.integers(-1, 2, num_students), 1, 6)
     
     # Create student dataframe
     students = pd.DataFrame({
         'student_id': student_ids,
         'name': names,
-        'enrollment_date': np.random.choice(pd.date_range(start='2022-01-01', end='2024-01-01', freq='D'), num_students),
-        'current_trimester': np.random.randint(1, 7, num_students),
-        'cgpa': np.random.uniform(5.0, 10.0, num_students).round(2),
+        'enrollment_date': enrollment_dates,
+        'current_trimester': current_trimester,
+        'cgpa': rng.uniform(5.0, 10.0, num_students).round(2),
     })
     
-    # Add some correlation between enrollment date and current trimester
-    for i, row in students.iterrows():
-        enrollment_date = row['enrollment_date']
-        today = datetime.now()
-        months_diff = (today.year - enrollment_date.year) * 12 + today.month - enrollment_date.month
-        expected_trimester = min(6, (months_diff // 4) + 1)
-        # Add some noise to the trimester (some students might have taken breaks or failed)
-        students.at[i, 'current_trimester'] = max(1, min(6, expected_trimester + random.randint(-1, 1)))
-    
     # Generate email addresses
-    students['email'] = students.apply(lambda x: f"{x['name'].split()[0].lower()}.{x['student_id'].lower()}@example.edu", axis=1)
+    students['email'] = first.str.lower() + '.' + student_ids.str.lower() + '@example.edu'
     
     return students
 
 def generate_course_enrollments(students_df):
     """Generate course enrollments for students"""
-    enrollments = []
+    # Every course in trimester order; a student in trimester t takes the courses
+    # of trimesters 1..t, which are the first course_counts[t] entries
+    course_names = [name for names in DS_COURSES.values() for name in names]
+    course_trimesters = np.array([int(key.split()[1]) for key, names in DS_COURSES.items() for _ in names])
+    course_counts = np.concatenate([[0], np.cumsum(np.bincount(course_trimesters)[1:])])
     
-    for _, student in students_df.iterrows():
-        student_id = student['student_id']
-        current_trimester = student['current_trimester']
-        
-        # Enroll in courses for all completed trimesters and current trimester
-        for trimester in range(1, current_trimester + 1):
-            trimester_key = f'Trimester {trimester}'
-            for course_name in DS_COURSES[trimester_key]:
-                course_code = COURSE_CODES[course_name]
-                instructor = INSTRUCTORS[course_name]
-                
-                # Determine if the course is completed or ongoing
-                is_completed = trimester < current_trimester
-                
-                enrollments.append({
-                    'student_id': student_id,
-                    'course_code': course_code,
-                    'course_name': course_name,
-                    'trimester': trimester_key,
-                    'instructor': instructor,
-                    'year': 2022 + (trimester - 1) // 3,
-                    'status': 'Completed' if is_completed else 'Ongoing',
-                })
-    
-    return pd.DataFrame(enrollments)
+    current_trimester = students_df['current_trimester'].to_numpy()
+    counts = course_counts[current_trimester]
+    student_rows = np.repeat(np.arange(len(students_df)), counts)
+    
+    # Position of each enrollment within its student's block is its course index
+    course_index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    trimesters = course_trimesters[course_index]
+    
+    def course_labels(values):
+        return pd.Categorical.from_codes(course_index, categories=values)
+    
+    return pd.DataFrame({
+        'student_id': pd.Categorical.from_codes(student_rows, categories=students_df['student_id']),
+        'course_code': course_labels([COURSE_CODES[name] for name in course_names]),
+        'course_name': course_labels(course_names),
+        'trimester': pd.Categorical.from_codes(trimesters - 1, categories=list(DS_COURSES)),
+        'instructor': pd.Categorical([INSTRUCTORS[name] for name in course_names])[course_index],
+        'year': 2022 + (trimesters - 1) // 3,
+        # Courses of earlier trimesters are completed, the current ones ongoing
+        'status': pd.Categorical.from_codes((trimesters == current_trimester[student_rows]).astype(np.int8),
+                                            categories=['Completed', 'Ongoing']),
+    })
+
+def assign_grades(total_score, completed):
+    """
+    Letter grade and grade point for each total score; a score on a band's lower
+    bound gets that band (90 is an A). Rows not completed get no grade.
+    """
+    band = np.searchsorted(GRADE_THRESHOLDS, total_score, side='right')
+    band = np.minimum(band, len(GRADES) - 1)
+    grade = pd.Categorical.from_codes(np.where(completed, band, -1), categories=GRADES)
+    grade_point = np.where(completed, GRADE_POINTS[band], np.nan)
+    return grade, grade_point
 
-def generate_performance_data(enrollments_df):
+def generate_performance_data(enrollments_df, rng=None):
     """Generate synthetic performance data for each enrollment"""
-    performance_data = []
+    rng = np.random.default_rng() if rng is None else rng
+    n = len(enrollments_df)
     
-    for _, enrollment in enrollments_df.iterrows():
-        student_id = enrollment['student_id']
-        course_code = enrollment['course_code']
-        status = enrollment['status']
-        
-        # Only generate complete performance data for completed courses
-        if status == 'Completed':
-            # Base scores - better students generally do better across all evaluations
-            student_ability = np.random.normal(70, 15)
-            
-            # Generate quiz and exam scores
-            quiz1_score = min(100, max(0, student_ability + np.random.normal(0, 10)))
-            quiz2_score = min(100, max(0, student_ability + np.random.normal(0, 10)))
-            endterm_score = min(100, max(0, student_ability + np.random.normal(0, 15)))
-            
-            # Generate assignment scores (12 assignments)
-            assignment_scores = []
-            for i in range(1, 13):
-                # Assignments get slightly better over time as students learn
-                assignment_trend = min(10, i * 0.5)
-                score = min(100, max(0, student_ability + assignment_trend + np.random.normal(0, 8)))
-                assignment_scores.append(score)
-            
-            # Calculate total score (weighted average)
-            # Weights: Quiz1 (15%), Quiz2 (15%), Endterm (40%), Assignments (30% total - 2.5% each)
-            total_score = (
-                0.15 * quiz1_score + 
-                0.15 * quiz2_score + 
-                0.40 * endterm_score + 
-                0.30 * (sum(assignment_scores) / len(assignment_scores))
-            )
-            
-            # Convert to grade
-            if total_score >= 90:
-                grade = 'A'
-                grade_point = 10
-            elif total_score >= 80:
-                grade = 'B'
-                grade_point = 9
-            elif total_score >= 70:
-                grade = 'C'
-                grade_point = 8
-            elif total_score >= 60:
-                grade = 'D'
-                grade_point = 7
-            elif total_score >= 50:
-                grade = 'E'
-                grade_point = 6
-            else:
-                grade = 'F'
-                grade_point = 0
-            
-            # Attendance
-            attendance_percentage = min(100, max(60, student_ability - np.random.uniform(0, 25)))
-                
-            performance_data.append({
-                'student_id': student_id,
-                'course_code': course_code,
-                'quiz1': round(quiz1_score, 2),
-                'quiz2': round(quiz2_score, 2),
-                'endterm': round(endterm_score, 2),
-                'assignment1': round(assignment_scores[0], 2),
-                'assignment2': round(assignment_scores[1], 2),
-                'assignment3': round(assignment_scores[2], 2),
-                'assignment4': round(assignment_scores[3], 2),
-                'assignment5': round(assignment_scores[4], 2),
-                'assignment6': round(assignment_scores[5], 2),
-                'assignment7': round(assignment_scores[6], 2),
-                'assignment8': round(assignment_scores[7], 2),
-                'assignment9': round(assignment_scores[8], 2),
-                'assignment10': round(assignment_scores[9], 2),
-                'assignment11': round(assignment_scores[10], 2),
-                'assignment12': round(assignment_scores[11], 2),
-                'total_score': round(total_score, 2),
-                'grade': grade,
-                'grade_point': grade_point,
-                'attendance_percentage': round(attendance_percentage, 2),
-            })
-        else:  # For ongoing courses, generate partial data
-            # Base scores
-            student_ability = np.random.normal(70, 15)
-            
-            # For ongoing courses, maybe only Quiz1 and some assignments are done
-            quiz1_score = min(100, max(0, student_ability + np.random.normal(0, 10)))
-            
-            # First 6 assignments are done
-            assignment_scores = []
-            for i in range(1, 7):
-                assignment_trend = min(10, i * 0.5)
-                score = min(100, max(0, student_ability + assignment_trend + np.random.normal(0, 8)))
-                assignment_scores.append(score)
-            
-            # Fill remaining assignments with NaN
-            assignment_scores.extend([None] * 6)
-            
-            # Attendance for ongoing course
-            attendance_percentage = min(100, max(60, student_ability - np.random.uniform(0, 25)))
-                
-            performance_data.append({
-                'student_id': student_id,
-                'course_code': course_code,
-                'quiz1': round(quiz1_score, 2),
-                'quiz2': None,  # Not done yet
-                'endterm': None,  # Not done yet
-                'assignment1': round(assignment_scores[0], 2),
-                'assignment2': round(assignment_scores[1], 2),
-                'assignment3': round(assignment_scores[2], 2),
-                'assignment4': round(assignment_scores[3], 2),
-                'assignment5': round(assignment_scores[4], 2),
-                'assignment6': round(assignment_scores[5], 2),
-                'assignment7': None,
-                'assignment8': None,
-                'assignment9': None,
-                'assignment10': None,
-                'assignment11': None,
-                'assignment12': None,
-                'total_score': None,  # Can't calculate yet
-                'grade': None,  # Can't determine yet
-                'grade_point': None,  # Can't determine yet
-                'attendance_percentage': round(attendance_percentage, 2),
-            })
-    
-    return pd.DataFrame(performance_data)
-
-def generate_interaction_data(students_df, enrollments_df):
-    """Generate system interaction data for students"""
-    interactions = []
-    current_date = datetime.now()
+    # Only completed courses get complete performance data; ongoing ones have
+    # quiz1, the first 6 assignments and attendance so far
+    completed = (enrollments_df['status'] == 'Completed').to_numpy()
+    
+    # Base scores - better students generally do better across all evaluations
+    student_ability = rng.normal(70, 15, n)
+    
+    # Generate quiz and exam scores
+    quiz1_score = np.clip(student_ability + rng.normal(0, 10, n), 0, 100)
+    quiz2_score = np.where(completed, np.clip(student_ability + rng.normal(0, 10, n), 0, 100), np.nan)
+    endterm_score = np.where(completed, np.clip(student_ability + rng.normal(0, 15, n), 0, 100), np.nan)
+    
+    # Generate assignment scores (12 assignments); assignments get slightly
+    # better over time as students learn
+    assignment_trend = np.minimum(10, np.arange(1, 13) * 0.5)
+    assignment_scores = np.clip(student_ability[:, None] + assignment_trend + rng.normal(0, 8, (n, 12)), 0, 100)
+    assignment_scores[~completed, 6:] = np.nan
+    
+    # Calculate total score (weighted average)
+    # Weights: Quiz1 (15%), Quiz2 (15%), Endterm (40%), Assignments (30% total - 2.5% each)
+    total_score = (
+        0.15 * quiz1_score +
+        0.15 * quiz2_score +
+        0.40 * endterm_score +
+        0.30 * assignment_scores.mean(axis=1)
+    )
+    
+    # Convert to grade (ongoing courses have none yet)
+    grade, grade_point = assign_grades(total_score, completed)
+    
+    # Attendance
+    attendance_percentage = np.clip(student_ability - rng.uniform(0, 25, n), 60, 100)
+    
+    performance = pd.DataFrame({
+        'student_id': enrollments_df['student_id'].array,
+        'course_code': enrollments_df['course_code'].array,
+        'quiz1': quiz1_score.round(2),
+        'quiz2': quiz2_score.round(2),
+        'endterm': endterm_score.round(2),
+    })
+    for i in range(12):
+        performance[f'assignment{i + 1}'] = assignment_scores[:, i].round(2)
+    performance['total_score'] = total_score.round(2)
+    performance['grade'] = grade
+    performance['grade_point'] = grade_point
+    performance['attendance_percentage'] = attendance_percentage.round(2)
+    
+    return performance
 
-    for _, student in students_df.iterrows():
-        student_id = student['student_id']
-        student_enrollments = enrollments_df[enrollments_df['student_id'] == student_id]
-        
-        # Generate between 20-100 interactions per student
-        num_interactions = random.randint(20, 100)
-        
-        for _ in range(num_interactions):
-            # Random date in the last 6 months
-            days_ago = random.randint(0, 180)
-            interaction_date = current_date - timedelta(days=days_ago)
-            
-            # If the student has enrollments, sometimes link the interaction to a course
-            if len(student_enrollments) > 0 and random.random() > 0.3:
-                course_row = student_enrollments.sample(1).iloc[0]
-                course_code = course_row['course_code']
-                course_name = course_row['course_name']
-            else:
-                course_code = None
-                course_name = None
-            
-            # Interaction types
-            interaction_types = [
-                'Login', 'Logout', 'View Course', 'Download Resource', 
-                'Submit Assignment', 'Take Quiz', 'Forum Post', 'Forum Reply',
-                'Watch Video', 'Chat with Tutor', 'Use Chatbot', 'Update Profile'
-            ]
-            
-            interaction_type = random.choice(interaction_types)
-            
-            # Session duration (for login events)
-            if interaction_type == 'Login':
-                duration_minutes = random.randint(5, 180)
-            else:
-                duration_minutes = None
-            
-            interactions.append({
-                'student_id': student_id,
-                'timestamp': interaction_date,
-                'interaction_type': interaction_type,
-                'course_code': course_code,
-                'course_name': course_name,
-                'duration_minutes': duration_minutes,
-            })
-    
-    return pd.DataFrame(interactions)
+def generate_interaction_data(students_df, enrollments_df, rng=None, reference_date=None):
+    """Generate system interaction data for students, up to reference_date (default now)"""
+    rng = np.random.default_rng() if rng is None else rng
+    current_date = reference_date or datetime.now()
+    
+    # Generate between 20-100 interactions per student
+    num_interactions = rng.integers(20, 101, len(students_df))
+    student_rows = np.repeat(np.arange(len(students_df)), num_interactions)
+    total = len(student_rows)
+    
+    # Random date in the last 6 months
+    days_ago = rng.integers(0, 181, total)
+    timestamps = pd.Timestamp(current_date) - pd.to_timedelta(days_ago, unit='D')
+    
+    # Each student's enrollments as a contiguous block of positions
+    enrollment_student = pd.Categorical(enrollments_df['student_id'], categories=students_df['student_id']).codes
+    enrollment_order = np.argsort(enrollment_student, kind='stable')
+    enrollment_counts = np.bincount(enrollment_student[enrollment_student >= 0], minlength=len(students_df))
+    enrollment_starts = np.cumsum(enrollment_counts) - enrollment_counts
+    
+    # If the student has enrollments, sometimes link the interaction to a random one of them
+    counts = enrollment_counts[student_rows]
+    linked = (counts > 0) & (rng.random(total) > 0.3)
+    positions = enrollment_starts[student_rows] + (rng.random(total) * counts).astype(np.int64)
+    picked = enrollment_order[positions[linked]]
+    course_code = pd.Categorical(enrollments_df['course_code'])
+    course_name = pd.Categorical(enrollments_df['course_name'])
+    course_code_codes = np.full(total, -1, dtype=course_code.codes.dtype)
+    course_code_codes[linked] = course_code.codes[picked]
+    course_name_codes = np.full(total, -1, dtype=course_name.codes.dtype)
+    course_name_codes[linked] = course_name.codes[picked]
+    
+    # Interaction types
+    interaction_types = [
+        'Login', 'Logout', 'View Course', 'Download Resource', 
+        'Submit Assignment', 'Take Quiz', 'Forum Post', 'Forum Reply',
+        'Watch Video', 'Chat with Tutor', 'Use Chatbot', 'Update Profile'
+    ]
+    interaction_type = rng.integers(0, len(interaction_types), total)
+    
+    # Session duration (for login events)
+    duration_minutes = np.where(interaction_type == 0, rng.integers(5, 181, total), np.nan)
+    
+    return pd.DataFrame({
+        'student_id': pd.Categorical.from_codes(student_rows, categories=students_df['student_id']),
+        'timestamp': timestamps,
+        'interaction_type': pd.Categorical.from_codes(interaction_type, categories=interaction_types),
+        'course_code': pd.Categorical.from_codes(course_code_codes, dtype=course_code.dtype),
+        'course_name': pd.Categorical.from_codes(course_name_codes, dtype=course_name.dtype),
+        'duration_minutes': duration_minutes,
+    })
 
-def generate_feedback_data(enrollments_df):
+def generate_feedback_data(enrollments_df, rng=None):
     """Generate course feedback data from students"""
-    feedback_data = []
-    
-    for _, enrollment in enrollments_df.iterrows():
-        # Only generate feedback for completed courses
-        if enrollment['status'] == 'Completed':
-            student_id = enrollment['student_id']
-            course_code = enrollment['course_code']
-            course_name = enrollment['course_name']
-            instructor = enrollment['instructor']
-            
-            # Ratings (1-5 scale)
-            # Better students tend to give more positive feedback
-            base_sentiment = np.random.normal(3.5, 0.8)
-            
-            course_rating = min(5, max(1, round(base_sentiment + np.random.normal(0, 0.5))))
-            instructor_rating = min(5, max(1, round(base_sentiment + np.random.normal(0, 0.5))))
-            content_rating = min(5, max(1, round(base_sentiment + np.random.normal(0, 0.5))))
-            difficulty_rating = min(5, max(1, round(5 - base_sentiment + np.random.normal(0, 0.5))))  # Inverse relationship
-            
-            # Feedback comments
-            positive_comments = [
-                "The course was well-structured and informative.",
-                "The instructor was very knowledgeable and helpful.",
-                "I learned a lot from this course.",
-                "The assignments were challenging but rewarding.",
-                "The course materials were excellent.",
-                "The instructor explained complex concepts clearly.",
-                "I enjoyed the practical aspects of this course.",
-                "The feedback on assignments was very helpful.",
-                "The course exceeded my expectations.",
-                "I would recommend this course to others."
-            ]
-            
-            negative_comments = [
-                "The course was too difficult.",
-                "I found the assignments too time-consuming.",
-                "The instructor was not very responsive to questions.",
-                "The content could be better organized.",
-                "The pace of the course was too fast.",
-                "More practical examples would have been helpful.",
-                "The assessment criteria were not clear.",
-                "The course materials need updating.",
-                "There was too much theoretical content.",
-                "Better explanation of complex topics is needed."
-            ]
-            
-            # Choose comment based on overall sentiment
-            avg_rating = (course_rating + instructor_rating + content_rating) / 3
-            if avg_rating > 3.5:
-                comment = random.choice(positive_comments)
-            elif avg_rating < 2.5:
-                comment = random.choice(negative_comments)
-            else:
-                # Mixed feedback
-                comment = f"{random.choice(positive_comments)} However, {random.choice(negative_comments).lower()}"
-            
-            feedback_data.append({
-                'student_id': student_id,
-                'course_code': course_code,
-                'course_name': course_name,
-                'instructor': instructor,
-                'course_rating': course_rating,
-                'instructor_rating': instructor_rating,
-                'content_rating': content_rating,
-                'difficulty_rating': difficulty_rating,
-                'comment': comment,
-                'submission_date': enrollment['year'] + np.random.randint(0, 2)
-            })
-    
-    return pd.DataFrame(feedback_data)
-
-def save_data_to_csv():
-    """Generate and save all synthetic data to CSV files"""
-    print("Generating student profiles...")
-    students = generate_student_profiles(num_students=150)
+    rng = np.random.default_rng() if rng is None else rng
     
-    print("Generating course enrollments...")
-    enrollments = generate_course_enrollments(students)
+    # Only generate feedback for completed courses
+    completed = enrollments_df[enrollments_df['status'] == 'Completed']
+    n = len(completed)
+    
+    # Ratings (1-5 scale)
+    # Better students tend to give more positive feedback
+    base_sentiment = rng.normal(3.5, 0.8, n)
     
-    print("Generating performance data...")
-    performance = generate_performance_data(enrollments)
+    def rating(center):
+        return np.clip(np.rint(center + rng.normal(0, 0.5, n)), 1, 5).astype(int)
     
-    print("Generating interaction data...")
-    interactions = generate_interaction_data(students, enrollments)
+    course_rating = rating(base_sentiment)
+    instructor_rating = rating(base_sentiment)
+    content_rating = rating(base_sentiment)
+    difficulty_rating = rating(5 - base_sentiment)  # Inverse relationship
     
-    print("Generating feedback data...")
-    feedback = generate_feedback_data(enrollments)
+    # Feedback comments
+    positive_comments = [
+        "The course was well-structured and informative.",
+        "The instructor was very knowledgeable and helpful.",
+        "I learned a lot from this course.",
+        "The assignments were challenging but rewarding.",
+        "The course materials were excellent.",
+        "The instructor explained complex concepts clearly.",
+        "I enjoyed the practical aspects of this course.",
+        "The feedback on assignments was very helpful.",
+        "The course exceeded my expectations.",
+        "I would recommend this course to others."
+    ]
     
-    # Create a courses DataFrame
+    negative_comments = [
+        "The course was too difficult.",
+        "I found the assignments too time-consuming.",
+        "The instructor was not very responsive to questions.",
+        "The content could be better organized.",
+        "The pace of the course was too fast.",
+        "More practical examples would have been helpful.",
+        "The assessment criteria were not clear.",
+        "The course materials need updating.",
+        "There was too much theoretical content.",
+        "Better explanation of complex topics is needed."
+    ]
+    
+    # Mixed feedback pairs a positive and a negative comment
+    mixed_comments = [f"{positive} However, {negative.lower()}" for positive in positive_comments for negative in negative_comments]
+    
+    # Choose comment based on overall sentiment
+    positive = rng.integers(0, len(positive_comments), n)
+    negative = rng.integers(0, len(negative_comments), n)
+    avg_rating = (course_rating + instructor_rating + content_rating) / 3
+    comment = np.where(avg_rating > 3.5, positive,
+                       np.where(avg_rating < 2.5, len(positive_comments) + negative,
+                                len(positive_comments) + len(negative_comments) + positive * len(negative_comments) + negative))
+    
+    return pd.DataFrame({
+        'student_id': completed['student_id'].array,
+        'course_code': completed['course_code'].array,
+        'course_name': completed['course_name'].array,
+        'instructor': completed['instructor'].array,
+        'course_rating': course_rating,
+        'instructor_rating': instructor_rating,
+        'content_rating': content_rating,
+        'difficulty_rating': difficulty_rating,
+        'comment': pd.Categorical.from_codes(comment, categories=positive_comments + negative_comments + mixed_comments),
+        'submission_date': completed['year'].to_numpy() + rng.integers(0, 2, n)
+    })
+
+def generate_courses():
+    """Create the courses DataFrame"""
     courses = []
     for course_name, course_code in COURSE_CODES.items():
         # Find which trimester this course belongs to
@@ -424,25 +372,175 @@ def save_data_to_csv():
             'credits': 4  # Assuming all courses are 4 credits
         })
     
-    courses_df = pd.DataFrame(courses)
+    return pd.DataFrame(courses)
+
+def generate_batches(num_students, batch_size=BATCH_SIZE, seed=None, reference_date=None):
+    """
+    Yield the student tables batch_size students at a time, as dicts of DataFrames
+    Batches are seeded like shards, so a seed gives the same rows as save_sharded_data
+    with shard_size=batch_size
+    """
+    seed = np.random.SeedSequence().entropy if seed is None else seed
+    reference_date = reference_date or datetime.now()
+    for batch in range(-(-num_students // batch_size)):
+        yield generate_shard(batch, num_students, batch_size, seed, reference_date)
+
+def save_data_to_csv(data_dir='data', num_students=150, seed=None, batch_size=BATCH_SIZE, progress=None,
+                     reference_date=None):
+    """
+    Generate and save all synthetic data to CSV files
+    Rows are streamed to disk one batch of students at a time, so memory stays
+    bounded by batch_size. The files are written under temporary names and moved
+    into place at the end. Dates are generated relative to reference_date (default
+    now); the same seed and reference_date generate the same dataset again.
+    progress, if given, is called as progress(stage, students_done, stats) after
+    every batch ('generating') and before the files are moved ('saving').
+    Returns the number of rows written per table.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    stats = dict.fromkeys(SHARDED_TABLES, 0)
+    tmp_paths = {table: os.path.join(data_dir, f'{table}.csv.tmp{os.getpid()}') for table in SHARDED_TABLES}
+    files = {table: open(path, 'w', newline='') for table, path in tmp_paths.items()}
+    
+    try:
+        print(f"Generating data for {num_students} students...")
+        students_done = 0
+        for batch in generate_batches(num_students, batch_size=batch_size, seed=seed, reference_date=reference_date):
+            for table, frame in batch.items():
+                frame.to_csv(files[table], header=files[table].tell() == 0, index=False)
+                stats[table] += len(frame)
+            students_done += len(batch['students'])
+            if progress:
+                progress('generating', students_done, stats)
+    except BaseException:
+        for table, handle in files.items():
+            handle.close()
+            os.remove(tmp_paths[table])
+        raise
     
-    # Save to CSV
+    # Move the new files into place, replacing any partitioned copy of the tables
     print("Saving data to CSV files...")
-    students.to_csv('data/students.csv', index=False)
-    enrollments.to_csv('data/enrollments.csv', index=False)
-    performance.to_csv('data/performance.csv', index=False)
-    interactions.to_csv('data/interactions.csv', index=False)
-    feedback.to_csv('data/feedback.csv', index=False)
-    courses_df.to_csv('data/courses.csv', index=False)
+    if progress:
+        progress('saving', num_students, stats)
+    for table, handle in files.items():
+        handle.close()
+        remove_table_files(data_dir, table)
+        os.replace(tmp_paths[table], os.path.join(data_dir, f'{table}.csv'))
+    
+    courses_df = generate_courses()
+    courses_df.to_csv(os.path.join(data_dir, 'courses.csv'), index=False)
+    stats['courses'] = len(courses_df)
     
     print("Data generation complete!")
-    return students, enrollments, performance, interactions, feedback, courses_df
+    return stats
+
+def generate_shard(shard, num_students, shard_size, seed, reference_date):
+    """
+    Generate the tables for one shard of the student ID range
+    The shard's generator is seeded from the master seed and the shard number
+    alone, so a shard comes out the same whichever worker builds it
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(shard,)))
+    first = shard * shard_size
+    
+    students = generate_student_profiles(num_students=min(shard_size, num_students - first), rng=rng,
+                                         first_id=first + 1, reference_date=reference_date)
+    enrollments = generate_course_enrollments(students)
+    return {
+        'students': students,
+        'enrollments': enrollments,
+        'performance': generate_performance_data(enrollments, rng=rng),
+        'interactions': generate_interaction_data(students, enrollments, rng=rng, reference_date=reference_date),
+        'feedback': generate_feedback_data(enrollments, rng=rng),
+    }
+
+def write_shard(data_dir, shard, num_students, shard_size, seed, reference_date):
+    """Generate one shard and write its part files; returns the rows written per table"""
+    tables = generate_shard(shard, num_students, shard_size, seed, reference_date)
+    for table, frame in tables.items():
+        frame.to_csv(os.path.join(data_dir, table, f'part-{shard:05d}.csv'), index=False)
+    return {table: len(frame) for table, frame in tables.items()}
+
+def remove_table_files(data_dir, table, keep_parts=False):
+    """Delete a table's CSV file and, unless keep_parts, the part files of its partitioned copy"""
+    paths = [os.path.join(data_dir, f'{table}.csv')]
+    if not keep_parts:
+        paths += glob.glob(os.path.join(data_dir, table, 'part-*.csv'))
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+def save_sharded_data(data_dir='data', num_students=150, shard_size=SHARD_SIZE, seed=None, max_workers=None,
+                      reference_date=None):
+    """
+    Generate the dataset in shards of shard_size students across a process pool
+    Each table is written as <data_dir>/<table>/part-<shard>.csv, which
+    PerformanceAnalytics reads like a single CSV; courses.csv stays one file.
+    Dates are generated relative to reference_date (default now). The same seed
+    and reference_date give the same files whatever max_workers is (0 generates
+    in this process). The parts are written to a staging directory and the table
+    directories are swapped in at the end, so a reload never sees half of them.
+    Returns the number of rows written per table.
+    """
+    # Without a seed, draw one so that every shard still derives from the same master seed
+    seed = np.random.SeedSequence().entropy if seed is None else seed
+    reference_date = reference_date or datetime.now()
+    num_shards = -(-num_students // shard_size)
+    
+    # The loader only looks at <table>.csv and <table>/, so it never reads the staging directory
+    staging_dir = os.path.join(data_dir, f'.shards.tmp{os.getpid()}')
+    for table in SHARDED_TABLES:
+        os.makedirs(os.path.join(staging_dir, table), exist_ok=True)
+    
+    try:
+        args = [(staging_dir, shard, num_students, shard_size, seed, reference_date) for shard in range(num_shards)]
+        if max_workers == 0:
+            shard_counts = [write_shard(*shard_args) for shard_args in args]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                shard_counts = list(pool.map(write_shard, *zip(*args)))
+        
+        courses = generate_courses()
+        courses.to_csv(os.path.join(staging_dir, 'courses.csv'), index=False)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    
+    # Swap the new table directories in, replacing the old parts and any single-file copy
+    for table in SHARDED_TABLES:
+        table_dir = os.path.join(data_dir, table)
+        old_dir = os.path.join(staging_dir, f'{table}.old')
+        if os.path.isdir(table_dir):
+            os.replace(table_dir, old_dir)
+        os.replace(os.path.join(staging_dir, table), table_dir)
+        remove_table_files(data_dir, table, keep_parts=True)
+    os.replace(os.path.join(staging_dir, 'courses.csv'), os.path.join(data_dir, 'courses.csv'))
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    
+    counts = {table: sum(counts[table] for counts in shard_counts) for table in SHARDED_TABLES}
+    counts['courses'] = len(courses)
+    print(f"Generated {num_students} students in {num_shards} shards")
+    return counts
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Generate the synthetic analytics dataset")
+    parser.add_argument('--students', type=int, help="number of students; writes partitioned tables")
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--reference-date', type=datetime.fromisoformat,
+                        help="date the data is generated as of, e.g. 2024-06-01 (default: now)")
+    options = parser.parse_args()
+    
     # Create data directory if it doesn't exist
-    import os
     if not os.path.exists('data'):
         os.makedirs('data')
     
     # Generate and save data
-    save_data_to_csv()
\ No newline at end of file
+    if options.students:
+        save_sharded_data('data', num_students=options.students, shard_size=options.shard_size,
+                          seed=options.seed, max_workers=options.workers, reference_date=options.reference_date)
+    else:
+        save_data_to_csv('data', seed=options.seed, reference_date=options.reference_date)
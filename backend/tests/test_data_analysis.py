@@ -1,9 +1,11 @@
 import os
 import pytest
+import numpy as np
 import pandas as pd
 from io import StringIO
 # Adjust the import path based on your project structure
-from backend.data_analysis import PerformanceAnalytics
+import backend.data_analysis as backend_data_analysis
+from backend.data_analysis import PerformanceAnalytics, read_table, read_interactions, get_analytics, reload_analytics
 from unittest.mock import patch, MagicMock # For mocking
 
 # --- Fixtures ---
@@ -74,6 +76,14 @@ def sample_data_dfs(sample_data_content):
     return dataframes
 
 
+@pytest.fixture
+def sample_data_dir(tmp_path, sample_data_content):
+    """Writes the sample CSVs to a temporary data directory"""
+    for filename, content in sample_data_content.items():
+        (tmp_path / filename).write_text(content)
+    return tmp_path
+
+
 @pytest.fixture
 def mock_read_csv(mocker, sample_data_dfs): # Use the pre-parsed DFs
     """Fixture to mock pd.read_csv by returning pre-parsed DataFrames."""
@@ -82,7 +92,13 @@ def mock_read_csv(mocker, sample_data_dfs): # Use the pre-parsed DFs
         if filename in sample_data_dfs:
             print(f"Mocking pd.read_csv for: {filename} - returning pre-parsed DF") # Debug print
             # Return the corresponding DataFrame directly
-            return sample_data_dfs[filename].copy() # Return a copy to avoid side effects between tests
+            frame = sample_data_dfs[filename].copy() # Return a copy to avoid side effects between tests
+            if kwargs.get('usecols') is not None:
+                frame = frame[list(kwargs['usecols'])]
+            if kwargs.get('chunksize'):
+                size = kwargs['chunksize']
+                return iter([frame.iloc[start:start + size] for start in range(0, len(frame), size)])
+            return frame
         else:
             raise FileNotFoundError(f"Mock pd.read_csv: No pre-parsed DataFrame for {filename}")
 
@@ -122,6 +138,172 @@ def test_load_data(analytics_instance):
     assert analytics_instance.courses is not None
     assert not analytics_instance.courses.empty
 
+def test_indexes_match_boolean_filters(analytics_instance):
+    """Test that indexed lookups return the same rows as a full-table filter"""
+    performance = analytics_instance.performance
+    rows = analytics_instance._rows('performance', 'student_id', 'DS002')
+    pd.testing.assert_frame_equal(rows, performance[performance['student_id'] == 'DS002'])
+
+    rows = analytics_instance._rows_for_keys('performance', 'course_code', ['MLT401', 'STAT101'])
+    pd.testing.assert_frame_equal(rows, performance[performance['course_code'].isin(['MLT401', 'STAT101'])])
+
+    assert analytics_instance._rows('enrollments', 'instructor', 'Nobody').empty
+
+def test_tables_use_compact_types(analytics_instance):
+    """Test that loaded tables get the compact schema and reports stay float64"""
+    performance = analytics_instance.performance
+    assert isinstance(performance['student_id'].dtype, pd.CategoricalDtype)
+    assert isinstance(performance['grade'].dtype, pd.CategoricalDtype)
+    assert performance['quiz1'].dtype == np.float32
+    assert performance['assignment12'].dtype == np.float32
+    assert isinstance(analytics_instance.enrollments['status'].dtype, pd.CategoricalDtype)
+    assert analytics_instance.feedback['course_rating'].dtype == np.int8
+
+    # Ongoing courses have no grade; that must stay missing, not become a 'nan' category
+    assert performance['grade'].isna().any()
+    assert 'nan' not in performance['grade'].cat.categories
+
+    # Scores handed out are widened back to the values in the CSV
+    course = analytics_instance.get_student_performance('DS001')['courses']['MLF301']
+    assert course['quiz1'] == 85.0
+    assert type(course['quiz1']) is float
+    metrics = analytics_instance.get_course_performance(course_code='MLF301')
+    assert metrics['avg_quiz1'] == 85.0
+    assert metrics['grade_distribution'] == {}
+
+def test_read_table_uses_feather_copy(tmp_path, sample_data_content):
+    """Test that a table is cached as Feather on first read and reused afterwards"""
+    pytest.importorskip('pyarrow')
+    (tmp_path / 'interactions.csv').write_text(sample_data_content['interactions.csv'])
+
+    from_csv = read_table(str(tmp_path), 'interactions')
+    assert (tmp_path / 'interactions.feather').exists()
+
+    with patch('pandas.read_csv', side_effect=AssertionError("CSV should not be parsed")):
+        from_feather = read_table(str(tmp_path), 'interactions')
+
+    pd.testing.assert_frame_equal(from_feather, from_csv)
+    assert pd.api.types.is_datetime64_any_dtype(from_feather['timestamp'])
+
+def test_feather_copy_ignored_when_csv_replaced_by_older_file(tmp_path, sample_data_content):
+    """Test that a CSV swapped for a file with an older mtime is parsed, not served from Feather"""
+    pytest.importorskip('pyarrow')
+    students_csv = tmp_path / 'students.csv'
+    students_csv.write_text(sample_data_content['students.csv'])
+    assert len(read_table(str(tmp_path), 'students')) == 3
+    feather_mtime = os.path.getmtime(tmp_path / 'students.feather')
+
+    # Restore an "older backup": fewer rows, and an mtime before the Feather copy
+    students_csv.write_text(sample_data_content['students.csv'].rsplit('\n', 2)[0] + '\n')
+    os.utime(students_csv, (feather_mtime - 3600, feather_mtime - 3600))
+
+    assert len(read_table(str(tmp_path), 'students')) == 2
+
+def test_partitioned_tables_read_like_single_files(tmp_path, sample_data_dir, sample_data_dfs):
+    """Test that a table split into part files loads the same as its single CSV"""
+    for filename, frame in sample_data_dfs.items():
+        table = filename[:-len('.csv')]
+        if table == 'courses':
+            (tmp_path / 'parts' / filename).parent.mkdir(exist_ok=True)
+            frame.to_csv(tmp_path / 'parts' / filename, index=False)
+            continue
+        (tmp_path / 'parts' / table).mkdir(parents=True)
+        for part, start in enumerate(range(0, len(frame), 2)):
+            frame.iloc[start:start + 2].to_csv(tmp_path / 'parts' / table / f'part-{part:05d}.csv', index=False)
+
+    single = PerformanceAnalytics(data_path=str(sample_data_dir))
+    partitioned = PerformanceAnalytics(data_path=str(tmp_path / 'parts'))
+    assert partitioned.load_error is None
+    pd.testing.assert_frame_equal(partitioned.performance, single.performance, check_categorical=False)
+    pd.testing.assert_frame_equal(partitioned.interactions, single.interactions, check_categorical=False)
+    pd.testing.assert_frame_equal(partitioned.student_courses, single.student_courses, check_categorical=False)
+    assert partitioned.get_student_performance('DS002')['calculated_gpa'] == single.get_student_performance('DS002')['calculated_gpa']
+
+    # Adding a part file changes the dataset signature
+    signature = backend_data_analysis.dataset_signature(str(tmp_path / 'parts'))
+    sample_data_dfs['students.csv'].head(1).to_csv(tmp_path / 'parts' / 'students' / 'part-09999.csv', index=False)
+    assert backend_data_analysis.dataset_signature(str(tmp_path / 'parts')) != signature
+
+def test_read_interactions_in_chunks(tmp_path, mocker):
+    """Test that the interaction log is read chunk by chunk into compact columns"""
+    mocker.patch('backend.data_analysis.INTERACTION_CHUNK_ROWS', 2)
+    now = pd.Timestamp.now()
+    log = pd.DataFrame({
+        'student_id': ['DS001', 'DS002', 'DS003', 'DS001', 'DS004'],
+        'timestamp': [now - pd.Timedelta(days=d) for d in (1, 400, 3, 5, 500)],
+        'interaction_type': ['Login', 'Login', 'Watch Video', 'Login', 'Take Quiz'],
+        'course_code': [None, None, 'MLF301', None, 'DL501'],
+        'course_name': [None, None, 'Machine Learning Foundations', None, 'Deep Learning'],
+        'duration_minutes': [30, 45, None, 15, None],
+    })
+    log.to_csv(tmp_path / 'interactions.csv', index=False)
+
+    frame = read_interactions(str(tmp_path))
+    assert len(frame) == 5
+    assert 'course_name' not in frame.columns
+    for column in ['student_id', 'interaction_type', 'course_code']:
+        assert isinstance(frame[column].dtype, pd.CategoricalDtype)
+    assert frame['duration_minutes'].dtype == np.float32
+    assert frame['student_id'].tolist() == log['student_id'].tolist()
+    # Events not linked to a course keep a missing course code
+    assert frame['course_code'].isna().sum() == log['course_code'].isna().sum() > 0
+    assert 'nan' not in frame['course_code'].cat.categories
+
+    # A retention window keeps only recent events and skips the Feather copy
+    (tmp_path / 'interactions.feather').unlink(missing_ok=True)
+    recent = read_interactions(str(tmp_path), retention_days=30)
+    assert sorted(recent['student_id'].tolist()) == ['DS001', 'DS001', 'DS003']
+    assert not (tmp_path / 'interactions.feather').exists()
+
+def test_shared_analytics_instance(mock_read_csv, mocker):
+    """Test that routes share one lazily created instance until it is reloaded"""
+    mocker.patch('backend.data_analysis.DEFAULT_DATA_PATH', 'mock_data_path')
+    mocker.patch('backend.data_analysis._shared_analytics', None)
+
+    first = get_analytics()
+    assert get_analytics() is first
+
+    reloaded = reload_analytics()
+    assert reloaded is not first
+    assert get_analytics() is reloaded
+
+def test_reload_keeps_ingested_interactions(mock_read_csv, mocker):
+    """Test that events added with ingest_interactions survive a reload from disk"""
+    mocker.patch('backend.data_analysis.DEFAULT_DATA_PATH', 'mock_data_path')
+    mocker.patch('backend.data_analysis._shared_analytics', None)
+
+    first = get_analytics()
+    logged = len(first.interactions)
+    first.ingest_interactions([{'student_id': 'DS003', 'interaction_type': 'Login', 'duration_minutes': 30}])
+    assert len(first.ingested_interactions()) == 1
+
+    reloaded = reload_analytics()
+    assert len(reloaded.interactions) == logged + 1
+    assert len(reloaded.ingested_interactions()) == 1
+    assert reloaded.get_student_performance('DS003')['login_count'] == 1
+
+def test_changed_files_trigger_background_reload(sample_data_dir, mocker):
+    """Test that rewriting a data file swaps in a freshly loaded instance"""
+    mocker.patch('backend.data_analysis.DEFAULT_DATA_PATH', str(sample_data_dir))
+    mocker.patch('backend.data_analysis._shared_analytics', None)
+    mocker.patch('backend.data_analysis.RELOAD_CHECK_INTERVAL', 0)
+    mocker.patch('backend.data_analysis.RELOAD_SETTLE_SECONDS', 0)
+
+    first = get_analytics()
+    assert get_analytics() is first
+
+    students_csv = sample_data_dir / 'students.csv'
+    students_csv.write_text(students_csv.read_text() + "DS004,Student Four,2024-01-10,1,7.0,student.four@example.edu\n")
+
+    backend_data_analysis.check_for_data_changes()
+    backend_data_analysis._reload_thread.join(timeout=10)
+
+    reloaded = get_analytics()
+    assert reloaded is not first
+    assert reloaded.dataset_version != first.dataset_version
+    assert 'DS004' in reloaded.students['student_id'].values
+    assert 'DS004' not in first.students['student_id'].values
+
 def test_get_course_performance(analytics_instance):
     """Test calculating performance for a specific course"""
     course_code = 'STAT201' # Completed course
@@ -138,6 +320,23 @@ def test_get_course_performance(analytics_instance):
     assert metrics['feedback_count'] == 1
     assert metrics['avg_course_rating'] == 4
 
+def test_course_performance_served_from_aggregates(analytics_instance):
+    """Test that per-course metrics come from the precomputed aggregates"""
+    assert set(analytics_instance.course_aggregates) == set(analytics_instance.performance['course_code'])
+
+    metrics = analytics_instance.get_course_performance(course_code='STAT101')
+    assert metrics['pass_rate'] == 0
+    assert metrics['grade_distribution'] == {'F': 1}
+    assert "Students are struggling with assignments. Consider providing additional practice or resources." in metrics['insights']
+
+    # Callers get their own copy of the cached figures
+    metrics['grade_distribution']['A'] = 5
+    assert analytics_instance.get_course_performance(course_code='STAT101')['grade_distribution'] == {'F': 1}
+
+    missing = analytics_instance.get_course_performance(course_code='NOPE101')
+    assert missing['num_students'] == 0
+    assert missing['course_name'] == 'Unknown Course'
+
 def test_get_student_performance(analytics_instance):
     """Test retrieving performance data for a specific student"""
     student_id = 'DS002'
@@ -156,6 +355,172 @@ def test_get_student_performance(analytics_instance):
     assert 'risk_score' in metrics
     assert metrics['risk_score'] > 0 # This student has low grades
 
+def test_score_percentiles_from_sorted_scores(analytics_instance):
+    """Test exact percentile ranks against a course's score distribution"""
+    analytics_instance.score_distributions['STAT201'] = np.array([50.0, 60.0, 60.0, 75.5, 90.0])
+
+    assert analytics_instance.get_score_percentile('STAT201', 75.5) == 70.0
+    assert analytics_instance.get_score_percentile('STAT201', 60.0) == 40.0
+    assert analytics_instance.get_score_percentile('STAT201', 100) == 100.0
+    assert analytics_instance.get_score_percentile('STAT201', None) is None
+    assert analytics_instance.get_score_percentile('NOPE', 75.5) is None
+
+    batch = analytics_instance.get_score_percentiles('STAT201', [10, 90.0, np.nan])
+    np.testing.assert_array_equal(batch, [0.0, 90.0, np.nan])
+
+    assert analytics_instance.get_class_percentiles('STAT201') == {'DS001': 70.0}
+
+def test_score_distributions_built_on_load(analytics_instance):
+    """Test that each course with total scores gets a sorted score array"""
+    distributions = analytics_instance.score_distributions
+    np.testing.assert_array_equal(distributions['MLT401'], [82.3])
+    assert 'MLF301' not in distributions
+    assert analytics_instance.get_score_percentile('MLT401', 82.3) == 50.0
+
+def test_course_comparisons_for_all_enrolled_courses(analytics_instance):
+    """Test that one call compares the student with the class in each enrolled course"""
+    comparisons = analytics_instance.get_course_comparisons('DS002')
+    assert [c['course_code'] for c in comparisons] == ['JAVA201', 'STAT101', 'PROG101']
+
+    by_code = {c['course_code']: c for c in comparisons}
+    prog = by_code['PROG101']
+    assert prog['course_name'] == 'Programming Basics'
+    assert prog['student_performance']['quiz1'] == 65.0
+    assert prog['student_performance']['grade'] == 'D'
+    assert prog['class_average']['quiz1'] == analytics_instance.get_course_performance(course_code='PROG101')['avg_quiz1']
+    assert prog['percentile'] == 50.0
+
+    assert analytics_instance.get_course_comparisons('NONEXISTENT') is None
+
+def test_instructor_course_performance_is_cached(analytics_instance, mocker):
+    """Test that instructor-wide summaries are memoized per dataset version"""
+    summarize = mocker.spy(analytics_instance, 'summarize_course_rows')
+    first = analytics_instance.get_course_performance(instructor='Dr. Vikram Iyer')
+    second = analytics_instance.get_course_performance(instructor='Dr. Vikram Iyer')
+    assert summarize.call_count == 1
+    assert first == second and first is not second
+
+    # Instructors without data are cached as well
+    assert analytics_instance.get_course_performance(instructor='Nobody')['num_students'] == 0
+    analytics_instance.get_course_performance(instructor='Nobody')
+    assert summarize.call_count == 1
+
+    stats = analytics_instance.cache_stats()['instructor_summaries']
+    assert stats['size'] == 2
+    assert stats['hits'] == 2 and stats['misses'] == 2
+
+    analytics_instance.dataset_version = 'new-version'
+    analytics_instance.get_course_performance(instructor='Dr. Vikram Iyer')
+    assert summarize.call_count == 2
+
+def test_student_course_records_from_joined_view(analytics_instance):
+    """Test that a student's course records come from the enrollment x performance view"""
+    metrics = analytics_instance.get_student_performance('DS001')
+
+    course = metrics['courses']['STAT201']
+    assert list(course)[:5] == ['course_code', 'course_name', 'trimester', 'instructor', 'status']
+    assert 'student_id' not in course
+    assert course['grade'] == 'C'
+    assert course['assignment12'] == 66
+    assert metrics['completed_courses'] == [course]
+    assert [c['course_code'] for c in metrics['ongoing_courses']] == ['MLF301']
+    assert metrics['calculated_gpa'] == 8
+
+def test_student_performance_is_cached_per_dataset_version(analytics_instance):
+    """Test that repeated lookups are served from the cache until the data version changes"""
+    first = analytics_instance.get_student_performance('DS002')
+    assert analytics_instance.get_student_performance('DS002') is first
+
+    stats = analytics_instance.student_cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+    analytics_instance.dataset_version = 'new-version'
+    assert analytics_instance.get_student_performance('DS002') is not first
+    assert analytics_instance.student_cache.stats()['misses'] == 2
+
+def test_ingest_interactions_updates_activity_counters(analytics_instance):
+    """Test that ingested events reach the counters and risk inputs without a reload"""
+    before = analytics_instance.get_student_performance('DS003')
+    assert before['total_interactions'] == 1
+    assert before['recent_activity_count'] == 0
+
+    added = analytics_instance.ingest_interactions([
+        {'student_id': 'DS003', 'interaction_type': 'Login', 'duration_minutes': 40},
+        {'student_id': 'DS003', 'interaction_type': 'Login', 'duration_minutes': 20},
+        {'student_id': 'DS003', 'timestamp': '2020-01-01 10:00:00', 'interaction_type': 'Watch Video'},
+    ])
+    assert added == 3
+
+    after = analytics_instance.get_student_performance('DS003')
+    assert after['total_interactions'] == 4
+    assert after['login_count'] == 2
+    assert after['recent_activity_count'] == 2
+    assert after['avg_session_minutes'] == 30
+
+    risk_frame = analytics_instance.get_student_risk_frame(['DS003'])
+    assert risk_frame.loc['DS003', 'recent_activity_count'] == 2
+
+    # The log itself holds the appended events as well
+    assert len(analytics_instance.interactions) == 8
+
+def test_count_recent_activity_windows(analytics_instance):
+    """Test day-bucketed activity counts over windows of different lengths"""
+    now = pd.Timestamp.now()
+    analytics_instance.ingest_interactions([
+        {'student_id': 'DS001', 'timestamp': now - pd.Timedelta(days=2), 'interaction_type': 'Login'},
+        {'student_id': 'DS001', 'timestamp': now - pd.Timedelta(days=20), 'interaction_type': 'Login'},
+        {'student_id': 'DS009', 'timestamp': now - pd.Timedelta(days=60), 'interaction_type': 'Login'},
+    ])
+
+    cohort = analytics_instance.count_recent_activity(days=7)
+    assert cohort['DS001'] == 1
+    assert cohort['DS009'] == 0
+
+    assert analytics_instance.count_recent_activity(days=30)['DS001'] == 2
+    assert analytics_instance.count_recent_activity(days=90)['DS009'] == 1
+
+    # Explicit ids use the same window; students never seen are left empty
+    some = analytics_instance.count_recent_activity(days=30, student_ids=['DS001', 'DS404'])
+    assert some['DS001'] == 2
+    assert pd.isna(some['DS404'])
+
+    # Windows wider than the kept history are counted from the whole log, without widening it
+    width = analytics_instance.activity_histogram.shape[1]
+    everything = analytics_instance.count_recent_activity(days=36500)
+    assert everything.sum() == len(analytics_instance.interactions)
+    assert analytics_instance.count_recent_activity(days=36500, student_ids=['DS001'])['DS001'] == everything['DS001']
+    assert analytics_instance.activity_histogram.shape[1] == width
+    assert analytics_instance.activity_histogram.dtype == np.uint16
+
+def test_activity_prefix_sums_follow_ingest(analytics_instance):
+    """Test that ingesting patches the cohort prefix sums instead of dropping them"""
+    analytics_instance.count_recent_activity(days=30)
+    prefix = analytics_instance._activity_prefix
+    assert prefix is not None and prefix.dtype == np.int32
+
+    now = pd.Timestamp.now()
+    analytics_instance.ingest_interactions([
+        {'student_id': 'DS002', 'timestamp': now - pd.Timedelta(days=3), 'interaction_type': 'Login'},
+        {'student_id': 'DS010', 'timestamp': now + pd.Timedelta(days=2), 'interaction_type': 'Login'},
+    ])
+    patched = analytics_instance._activity_prefix
+    assert patched is not None
+    cohort = analytics_instance.count_recent_activity(days=30)
+
+    # Same answer as prefix sums rebuilt from scratch
+    analytics_instance._activity_prefix = None
+    pd.testing.assert_series_equal(analytics_instance.count_recent_activity(days=30), cohort)
+    np.testing.assert_array_equal(analytics_instance._activity_prefix, patched)
+    assert cohort['DS010'] == 1
+
+    # A day busier than uint16 can count saturates rather than wrapping around
+    analytics_instance.ingest_interactions(pd.DataFrame({
+        'student_id': 'DS003', 'timestamp': now, 'interaction_type': 'Login'
+    }, index=range(70000)))
+    row = analytics_instance.activity_students.get_loc('DS003')
+    assert analytics_instance.activity_histogram[row].max() == np.iinfo(np.uint16).max
+
 def test_get_at_risk_students_instructor(analytics_instance):
     """Test finding at-risk students for an instructor"""
     instructor_name = 'Dr. Priya Singh' # Teaches STAT101 (low grade) and STAT201
@@ -172,6 +537,101 @@ def test_get_at_risk_students_instructor(analytics_instance):
     ds001_risk = next((s for s in at_risk if s['student_id'] == 'DS001'), None)
     assert ds001_risk is None or ds001_risk['risk_score'] <= 0.4
 
+def test_precomputed_dashboards_are_served_from_cache(analytics_instance, mocker):
+    """Test that precomputed dashboards are reused, recomputing only at-risk students after ingest"""
+    stored = analytics_instance.precompute_instructor_dashboards(max_workers=0)
+    assert stored == analytics_instance.courses['instructor'].nunique()
+
+    build = mocker.spy(analytics_instance, 'build_dashboard_courses')
+    at_risk = mocker.spy(analytics_instance, 'get_at_risk_students')
+    dashboard = analytics_instance.get_cached_instructor_dashboard('Dr. Vikram Iyer')
+    assert dashboard['instructor_name'] == 'Dr. Vikram Iyer'
+    assert analytics_instance.get_cached_instructor_dashboard('Dr. Vikram Iyer') is dashboard
+    build.assert_not_called()
+    assert at_risk.call_count == 1
+
+    # Ingested events change the results version, but not the course part
+    analytics_instance.ingest_interactions([{'student_id': 'DS001', 'interaction_type': 'Login'}])
+    assert analytics_instance.get_cached_instructor_dashboard('Dr. Vikram Iyer') is not dashboard
+    build.assert_not_called()
+    assert at_risk.call_count == 2
+    assert analytics_instance.dashboards_version == analytics_instance.dataset_version
+
+def test_background_precompute_builds_in_process(mock_read_csv, mocker):
+    """Test that the web app's precompute never spawns worker processes"""
+    mocker.patch('backend.data_analysis.DEFAULT_DATA_PATH', 'mock_data_path')
+    mocker.patch('backend.data_analysis._shared_analytics', None)
+    mocker.patch('backend.data_analysis._precompute_thread', None)
+    pool = mocker.patch('backend.data_analysis.ProcessPoolExecutor')
+
+    analytics = get_analytics()
+    backend_data_analysis.request_dashboard_precompute().join()
+    pool.assert_not_called()
+    assert analytics.dashboards_version == analytics.dataset_version
+
+def test_precompute_dashboards_in_worker_processes(sample_data_dir, mocker):
+    """Test that dashboards built by worker processes are stored and served by other instances"""
+    analytics = PerformanceAnalytics(data_path=str(sample_data_dir))
+    build = mocker.spy(analytics, 'build_dashboard_courses')
+    analytics.precompute_instructor_dashboards(max_workers=2)
+    build.assert_not_called()
+    assert (sample_data_dir / backend_data_analysis.DASHBOARD_STORE_FILE).exists()
+
+    # A fresh instance, like the web app's, serves them from the store
+    served = PerformanceAnalytics(data_path=str(sample_data_dir))
+    build = mocker.spy(served, 'build_dashboard_courses')
+    for instructor in analytics.courses['instructor'].unique():
+        cached = served.get_cached_instructor_dashboard(instructor)
+        expected = analytics.get_instructor_dashboard_data(instructor)
+        assert cached['courses'].keys() == expected['courses'].keys()
+        assert cached['at_risk_students_count'] == expected['at_risk_students_count']
+    build.assert_not_called()
+
+    # Nothing is rebuilt while the dataset is unchanged
+    assert served.precompute_instructor_dashboards(max_workers=0) == analytics.courses['instructor'].nunique()
+    build.assert_not_called()
+
+def test_at_risk_batch_matches_student_performance(analytics_instance):
+    """Test that batch risk scoring agrees with the per-student metrics"""
+    at_risk = analytics_instance.get_at_risk_students()
+
+    expected = []
+    for student_id in analytics_instance.students['student_id']:
+        metrics = analytics_instance.get_student_performance(student_id)
+        if metrics.get('risk_score', 0) > 0.4:
+            expected.append((student_id, metrics['risk_score'], analytics_instance.get_risk_factors(metrics)))
+    expected.sort(key=lambda x: x[1], reverse=True)
+
+    assert [(s['student_id'], s['risk_score'], s['key_factors']) for s in at_risk] == expected
+
+def test_at_risk_students_use_trained_model_in_one_call(analytics_instance):
+    """Test that a trained model scores the whole scope with a single predict_proba call"""
+    model = MagicMock()
+    model.classes_ = np.array([0, 1])
+    model.predict_proba.side_effect = lambda X: np.column_stack([1 - X[:, 0] / 100, X[:, 0] / 100])
+    scaler = MagicMock()
+    scaler.transform.side_effect = lambda X: X
+    analytics_instance.at_risk_model = {'model': model, 'scaler': scaler, 'accuracy': 1.0}
+
+    at_risk = analytics_instance.get_at_risk_students()
+    assert model.predict_proba.call_count == 1
+
+    # Probability is the mean quiz1 / 100 over records with attendance in this stub
+    scores = {s['student_id']: s['risk_score'] for s in at_risk}
+    assert scores == {'DS001': pytest.approx(0.7), 'DS002': pytest.approx(0.6), 'DS003': pytest.approx(0.78)}
+    assert analytics_instance.get_student_performance('DS001')['risk_score'] == pytest.approx(0.7)
+
+def test_predict_student_risk_falls_back_to_rules(analytics_instance):
+    """Test that the rule-based score is used without a model or without complete features"""
+    metrics = {'avg_attendance': 65, 'calculated_gpa': 5.5, 'recent_activity_count': 2}
+    assert analytics_instance.predict_student_risk(metrics) == pytest.approx(0.9)
+
+    model = MagicMock()
+    analytics_instance.at_risk_model = {'model': model, 'scaler': MagicMock(), 'accuracy': 1.0}
+    features = pd.Series({'quiz1': np.nan, 'attendance_percentage': 65.0, 'assignment_mean': 50.0})
+    assert analytics_instance.predict_student_risk(metrics, features=features) == pytest.approx(0.9)
+    model.predict_proba.assert_not_called()
+
 def test_train_risk_model(analytics_instance, mocker):
     """Test the risk model training placeholder"""
     # Ensure it can run without crashing and returns a dict (or None if insufficient data)
@@ -184,11 +644,43 @@ def test_train_risk_model(analytics_instance, mocker):
         assert 'scaler' in result
         assert 'accuracy' in result
         assert 0 <= result['accuracy'] <= 1
+        assert result['training_seconds'] >= 0
     else:
         # Handle case where training wasn't possible (e.g., no completed courses)
         # In our sample data, training should be possible.
         pass # Or assert result is None if that's the expected outcome for no data
 
+def test_risk_features_for_training_rows(analytics_instance):
+    """Test the vectorized feature matrix and targets used for training"""
+    completed = analytics_instance.performance.dropna(subset=['grade'])
+    features = analytics_instance.build_risk_features(completed)
+
+    assert list(features.columns) == ['quiz1', 'attendance_percentage', 'assignment_mean']
+    stat201 = features[completed['course_code'] == 'STAT201'].iloc[0]
+    assert stat201['quiz1'] == 70.0
+    assert stat201['attendance_percentage'] == 88.0
+    assert stat201['assignment_mean'] == pytest.approx(65.0)
+
+    result = analytics_instance.train_risk_prediction_model(n_jobs=2)
+    assert result['model'].n_jobs == 2
+    assert result['training_rows'] == 4
+
+def test_persisted_risk_model_is_loaded_by_new_instances(sample_data_dir):
+    """Test that a saved risk model and its metadata are picked up on startup"""
+    trainer = PerformanceAnalytics(data_path=str(sample_data_dir))
+    assert trainer.at_risk_model is None
+
+    result = trainer.train_risk_prediction_model(persist=True)
+    assert (sample_data_dir / 'risk_model.joblib').exists()
+    assert result['training_rows'] == 4
+    assert result['dataset_version'] == trainer.dataset_version
+
+    worker = PerformanceAnalytics(data_path=str(sample_data_dir))
+    assert worker.at_risk_model is not None
+    assert worker.at_risk_model['accuracy'] == result['accuracy']
+    assert worker.at_risk_model['dataset_version'] == trainer.dataset_version
+    assert 'risk_score' in worker.get_student_performance('DS003')
+
 # Add more tests for edge cases:
 # - Student not found
 # - Course not found
@@ -1,8 +1,10 @@
 import pytest
+import threading
+import time
 from unittest.mock import patch, MagicMock # Use MagicMock for mocking objects/methods
 
 # Adjust import path
-from backend.llm_integration import NarrativeGenerator
+from backend.llm_integration import NarrativeGenerator, NarrativeCache
 
 @pytest.fixture
 def mock_generative_model(mocker):
@@ -147,5 +149,89 @@ def test_generate_course_recommendation(narrative_generator_instance, mock_gener
 
     assert recommendations == "Mocked LLM Narrative Response"
 
+def test_repeated_narrative_is_served_from_cache(narrative_generator_instance, mock_generative_model, sample_instructor_dashboard_data):
+    """Test that an unchanged dashboard reuses the cached narrative"""
+    mock_model, _ = mock_generative_model
+    generator = narrative_generator_instance
+    data = sample_instructor_dashboard_data
+
+    first = generator.generate_instructor_narrative(data)
+    second = generator.generate_instructor_narrative(dict(data))
+    assert first == second == "Mocked LLM Narrative Response"
+    mock_model.generate_content.assert_called_once()
+
+    # A change to a prompt field produces a new key
+    generator.generate_instructor_narrative({**data, 'at_risk_students_count': 6})
+    assert mock_model.generate_content.call_count == 2
+    assert generator.cache.stats()['hits'] == 1
+
+def test_fallback_narrative_is_not_cached(narrative_generator_instance, mock_generative_model, sample_student_data):
+    """Test that a response without text is retried on the next request"""
+    mock_model, _ = mock_generative_model
+    mock_model.generate_content.return_value = object()
+    generator = narrative_generator_instance
+
+    assert generator.generate_student_narrative(sample_student_data) == "Unable to generate narrative at this time."
+    generator.generate_student_narrative(sample_student_data)
+    assert mock_model.generate_content.call_count == 2
+    assert generator.cache.stats()['size'] == 0
+
+def test_narrative_cache_eviction_expiry_and_persistence(tmp_path, mocker):
+    """Test LRU eviction, TTL expiry and reloading entries from disk"""
+    path = tmp_path / 'narratives.json'
+    cache = NarrativeCache(maxsize=2, ttl=60, path=str(path))
+    cache.set('a', 'first')
+    cache.set('b', 'second')
+    cache.get('a')
+    cache.set('c', 'third')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'first'
+
+    # A new cache on the same file picks up the surviving entries
+    reloaded = NarrativeCache(maxsize=2, ttl=60, path=str(path))
+    assert reloaded.get('a') == 'first'
+    assert reloaded.get('c') == 'third'
+
+    mocker.patch('backend.llm_integration.time.time', return_value=10 ** 12)
+    assert reloaded.get('a') is None
+
+def test_narrative_cache_keeps_entries_written_by_other_processes(tmp_path):
+    """Test that saving merges with the file instead of overwriting another writer's entries"""
+    path = tmp_path / 'narratives.json'
+    first = NarrativeCache(maxsize=4, ttl=60, path=str(path))
+    second = NarrativeCache(maxsize=4, ttl=60, path=str(path))
+    first.set('a', 'first')
+    second.set('b', 'second')
+    assert second.get('a') == 'first'
+
+    reloaded = NarrativeCache(maxsize=4, ttl=60, path=str(path))
+    assert reloaded.get('a') == 'first'
+    assert reloaded.get('b') == 'second'
+    assert not list(tmp_path.glob('*.tmp*'))
+
+def test_narrative_generated_in_background(narrative_generator_instance, mock_generative_model, sample_student_data):
+    """Test that submitting returns at once and the narrative is fetched by key"""
+    mock_model, _ = mock_generative_model
+    generator = narrative_generator_instance
+    release = threading.Event()
+    response = mock_model.generate_content.return_value
+    mock_model.generate_content.side_effect = lambda prompt: release.wait(5) and response
+
+    job = generator.submit_student_narrative(sample_student_data)
+    assert job['status'] == 'pending' and job['narrative'] is None
+    # A second request for the same data joins the job in flight
+    assert generator.submit_student_narrative(sample_student_data)['key'] == job['key']
+    assert generator.get_narrative_job(job['key'], 'instructor') is None
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while generator.get_narrative_job(job['key'], 'student')['status'] == 'pending' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert generator.get_narrative_job(job['key'], 'student')['narrative'] == "Mocked LLM Narrative Response"
+    mock_model.generate_content.assert_called_once()
+
+    # Once cached, the narrative is ready immediately
+    assert generator.submit_student_narrative(sample_student_data)['status'] == 'ready'
+
 # Add tests for error handling, e.g., what happens if GEMINI_API_KEY is missing
 # (May need to adjust mocking setup for os.getenv to test this)
\ No newline at end of file
@@ -0,0 +1,126 @@
+import pytest
+import filecmp
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# Adjust import path
+from backend.synthetic_data_generator import (
+    generate_shard, assign_grades, save_data_to_csv, save_sharded_data, SHARDED_TABLES, DS_COURSES, GRADES
+)
+
+REFERENCE_DATE = datetime(2024, 6, 1)
+
+@pytest.fixture(scope='module')
+def shard():
+    """One seeded shard of 60 students"""
+    return generate_shard(0, 60, 60, seed=7, reference_date=REFERENCE_DATE)
+
+def test_tables_have_the_csv_columns(shard):
+    """Test that every generated table has the columns the analytics code reads"""
+    assignments = [f'assignment{i}' for i in range(1, 13)]
+    assert list(shard['students'].columns) == ['student_id', 'name', 'enrollment_date', 'current_trimester', 'cgpa', 'email']
+    assert list(shard['enrollments'].columns) == ['student_id', 'course_code', 'course_name', 'trimester', 'instructor', 'year', 'status']
+    assert list(shard['performance'].columns) == (['student_id', 'course_code', 'quiz1', 'quiz2', 'endterm'] + assignments
+                                                  + ['total_score', 'grade', 'grade_point', 'attendance_percentage'])
+    assert list(shard['interactions'].columns) == ['student_id', 'timestamp', 'interaction_type', 'course_code', 'course_name', 'duration_minutes']
+    assert list(shard['feedback'].columns) == ['student_id', 'course_code', 'course_name', 'instructor', 'course_rating',
+                                               'instructor_rating', 'content_rating', 'difficulty_rating', 'comment', 'submission_date']
+    assert shard['students']['student_id'].iloc[0] == 'DS001'
+    assert shard['students']['current_trimester'].between(1, 6).all()
+
+def test_same_seed_gives_same_shard(shard):
+    """Test that a shard depends only on the seed, shard number and reference date"""
+    again = generate_shard(0, 60, 60, seed=7, reference_date=REFERENCE_DATE)
+    for table, frame in shard.items():
+        pd.testing.assert_frame_equal(again[table], frame)
+
+def test_grade_bands_include_their_lower_bound():
+    """Test that a score on a threshold gets the higher grade"""
+    scores = np.array([0, 49.99, 50, 59.99, 60, 69.99, 70, 79.99, 80, 89.99, 90, 100])
+    grade, grade_point = assign_grades(scores, np.ones(len(scores), dtype=bool))
+    assert list(grade) == ['F', 'F', 'E', 'E', 'D', 'D', 'C', 'C', 'B', 'B', 'A', 'A']
+    assert grade_point.tolist() == [0, 0, 6, 6, 7, 7, 8, 8, 9, 9, 10, 10]
+
+    grade, grade_point = assign_grades(np.array([95.0]), np.array([False]))
+    assert pd.isna(grade[0]) and np.isnan(grade_point[0])
+
+def test_enrollments_cover_every_trimester_so_far(shard):
+    """Test that a student in trimester t takes all courses of trimesters 1..t, only the last ongoing"""
+    students = shard['students'].set_index('student_id')
+    enrollments = shard['enrollments']
+    trimester = enrollments['trimester'].astype(str).str.split().str[1].astype(int)
+    current = enrollments['student_id'].astype(str).map(students['current_trimester'])
+
+    counts = enrollments.groupby(enrollments['student_id'].astype(str)).size()
+    assert (counts == students['current_trimester'] * 4).all()
+    assert (trimester <= current).all()
+    assert ((enrollments['status'] == 'Ongoing') == (trimester == current)).all()
+    for name, code in zip(enrollments['course_name'], enrollments['trimester']):
+        assert name in DS_COURSES[code]
+
+def test_ongoing_courses_have_partial_scores(shard):
+    """Test that ongoing courses have no quiz2, endterm, later assignments or grade"""
+    performance = shard['performance']
+    ongoing = (shard['enrollments']['status'] == 'Ongoing').to_numpy()
+    late = ['quiz2', 'endterm'] + [f'assignment{i}' for i in range(7, 13)] + ['total_score', 'grade', 'grade_point']
+    early = ['quiz1'] + [f'assignment{i}' for i in range(1, 7)] + ['attendance_percentage']
+
+    assert ongoing.any() and (~ongoing).any()
+    assert performance.loc[ongoing, late].isna().all().all()
+    assert performance.loc[ongoing, early].notna().all().all()
+    assert performance.loc[~ongoing].notna().all().all()
+    assert set(performance['grade'].dropna()) <= set(GRADES)
+
+    # Completed grades follow the total score; the saved total is rounded, so
+    # it can only disagree where rounding lifted it onto a threshold
+    completed = performance.loc[~ongoing]
+    expected, _ = assign_grades(completed['total_score'].to_numpy(), np.ones(len(completed), dtype=bool))
+    differs = completed['grade'].astype(str).to_numpy() != np.asarray(expected).astype(str)
+    assert completed['total_score'][differs].isin([50, 60, 70, 80, 90]).all()
+
+def test_feedback_comment_follows_ratings(shard):
+    """Test that comments are positive, negative or mixed by the average rating, for completed courses only"""
+    feedback = shard['feedback']
+    assert len(feedback) == (shard['enrollments']['status'] == 'Completed').sum()
+
+    avg = feedback[['course_rating', 'instructor_rating', 'content_rating']].mean(axis=1)
+    comment = feedback['comment'].astype(str)
+    mixed = comment.str.contains(' However, ')
+    assert not mixed[avg > 3.5].any()
+    assert not mixed[avg < 2.5].any()
+    assert mixed[(avg >= 2.5) & (avg <= 3.5)].all()
+    assert feedback[['course_rating', 'instructor_rating', 'content_rating', 'difficulty_rating']].stack().between(1, 5).all()
+
+def test_sharded_files_do_not_depend_on_workers(tmp_path):
+    """Test that worker processes write byte-identical part files to generating in process"""
+    counts = {}
+    for workers in (0, 2):
+        counts[workers] = save_sharded_data(str(tmp_path / str(workers)), num_students=50, shard_size=20, seed=11,
+                                            max_workers=workers, reference_date=REFERENCE_DATE)
+    assert counts[0] == counts[2]
+    assert counts[0]['students'] == 50
+
+    for table in SHARDED_TABLES:
+        parts = sorted(path.name for path in (tmp_path / '0' / table).iterdir())
+        assert parts == ['part-00000.csv', 'part-00001.csv', 'part-00002.csv']
+        match, mismatch, errors = filecmp.cmpfiles(tmp_path / '0' / table, tmp_path / '2' / table, parts, shallow=False)
+        assert mismatch == [] and errors == []
+
+def test_same_seed_and_reference_date_give_same_files(tmp_path):
+    """Test that streamed generation is reproducible once the reference date is fixed"""
+    for run in ('a', 'b'):
+        save_data_to_csv(str(tmp_path / run), num_students=30, seed=5, batch_size=10, reference_date=REFERENCE_DATE)
+    names = [f'{table}.csv' for table in SHARDED_TABLES + ['courses']]
+    match, mismatch, errors = filecmp.cmpfiles(tmp_path / 'a', tmp_path / 'b', names, shallow=False)
+    assert sorted(match) == sorted(names)
+
+def test_sharded_data_replaces_existing_dataset(tmp_path):
+    """Test that regenerating swaps in complete table directories and cleans up its staging area"""
+    save_data_to_csv(str(tmp_path), num_students=10, seed=3, reference_date=REFERENCE_DATE)
+    save_sharded_data(str(tmp_path), num_students=50, shard_size=20, seed=3, max_workers=0, reference_date=REFERENCE_DATE)
+    save_sharded_data(str(tmp_path), num_students=15, shard_size=20, seed=3, max_workers=0, reference_date=REFERENCE_DATE)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(SHARDED_TABLES + ['courses.csv'])
+    for table in SHARDED_TABLES:
+        assert [path.name for path in (tmp_path / table).iterdir()] == ['part-00000.csv']